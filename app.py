@@ -3,12 +3,17 @@ import streamlit as st # type: ignore
 import numpy as np
 import tempfile
 import cv2
-from pdf2image import convert_from_bytes
-from app_entry import run_application
+from preprocessing.page_source import PageSource
+from app_entry import run_application, run_document
 from utlis.logger import AppLogger
+from runtime.warmup import WARMUP_ON_START, start_warmup_in_background
 
 logger = AppLogger()
 
+# Optional model warm-up + readiness probe (runs once per process)
+if WARMUP_ON_START:
+    start_warmup_in_background()
+
 # Initialize logs
 if "logs" not in st.session_state:
     st.session_state["logs"] = []
@@ -56,30 +61,46 @@ tab1, tab2, tab3, tab4 = st.tabs(["Upload Document", "Metrics", "Results", "Deve
 with tab1:
 
     uploaded_file = st.file_uploader(
-        "Upload document (Image or PDF - single page)",
-        type=["png", "jpg", "jpeg", "pdf"]
+        "Upload document (Image or PDF)",
+        type=["png", "jpg", "jpeg", "pdf", "tif", "tiff"]
     )
 
+    # Every rerun sees the same upload: its pages are loaded once per
+    # file_id, and the temp file of a replaced or removed upload deleted
+    loaded = st.session_state.get("loaded_upload")
+    upload_id = uploaded_file.file_id if uploaded_file else None
+
+    if loaded is not None and loaded["file_id"] != upload_id:
+        if isinstance(loaded["pages"], PageSource):
+            loaded["pages"].close()
+        del st.session_state["loaded_upload"]
+        loaded = None
+
     if uploaded_file:
 
-        # Read file only ONCE
-        uploaded_bytes = uploaded_file.read()
+        if loaded is None:
+
+            # Read file only ONCE
+            uploaded_bytes = uploaded_file.read()
 
-        if uploaded_file.type == "application/pdf":
-            # pdf_pages = convert_from_bytes(uploaded_bytes)
-            # preview_image = cv2.cvtColor(np.array(pdf_pages[0]), cv2.COLOR_RGB2BGR)
+            suffix = os.path.splitext(uploaded_file.name)[1].lower()
 
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                tmp.write(uploaded_bytes)
-                temp_path = tmp.name
+            if suffix in (".pdf", ".tif", ".tiff"):
 
-            pdf_pages = convert_from_bytes(open(temp_path, "rb").read())
-            preview_image = cv2.cvtColor(np.array(pdf_pages[0]), cv2.COLOR_RGB2BGR)
+                # Pages are rendered one at a time, only page 1 for the preview
+                pages = PageSource.from_bytes(uploaded_bytes, suffix, dpi=200)
+                preview = pages.page(0)
 
+            else:
+                file_bytes = np.asarray(bytearray(uploaded_bytes), dtype=np.uint8)
+                preview = cv2.imdecode(file_bytes, 1)
+                pages = [preview]
+
+            loaded = {"file_id": upload_id, "pages": pages, "preview": preview}
+            st.session_state["loaded_upload"] = loaded
 
-        else:
-            file_bytes = np.asarray(bytearray(uploaded_bytes), dtype=np.uint8)
-            preview_image = cv2.imdecode(file_bytes, 1)
+        document_pages = loaded["pages"]
+        preview_image = loaded["preview"]
 
         st.session_state["preview_image"] = preview_image
 
@@ -92,7 +113,10 @@ with tab1:
 
         if run_btn:
             with st.spinner("Processing document..."):
-                result = run_application(preview_image)
+                if len(document_pages) > 1:
+                    result = run_document(document_pages)
+                else:
+                    result = run_application(preview_image)
 
             st.session_state["results"] = result
 
@@ -103,7 +127,11 @@ with tab1:
 
         st.divider()
 
-        st.image(preview_image, width=650, caption="Document Preview",)
+        preview_caption = "Document Preview"
+        if len(document_pages) > 1:
+            preview_caption += f" (page 1 of {len(document_pages)})"
+
+        st.image(preview_image, width=650, caption=preview_caption,)
 
 # TAB 2 - METRICS
 with tab2:
@@ -121,6 +149,9 @@ with tab2:
 
     st.subheader("Extraction Overview")
 
+    if metrics.get("page_count", 1) > 1:
+        st.caption(f"Pages processed: {metrics['page_count']}")
+
     c1, c2, c3, c4 = st.columns(4)
 
     c1.metric("Tables Detected", metrics.get("table_count", 0))
@@ -1,201 +1,805 @@
 import os
 import tempfile
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
+from layout_detection import layout_model
 from layout_detection.layout_model import detect_layout
-from table_extraction.extractor import extract_clean_table
+from table_extraction.extractor import extract_clean_table_with_transform
+from table_extraction.table_selector import select_main_table
+from ocr.page_ocr import PageOCR
 
 from pipeline.hybrid_table_extractor import HybridTableExtractor
 from postprocessing.table_cleaner import TableCleaner
 from export.excel_exporter import ExcelExporter
 from metrics.confidence_analyzer import ConfidenceAnalyzer
+from ocr import ocr_engine
+from ocr.ocr_engine import get_angle_cls_stats, page_needs_angle_cls
+from pipeline import table_router
+from pipeline import speculative
+from pipeline.budget import (
+    LatencyBudget, MAIN_TABLE_ONLY, TABLE_BUDGET_SEC, add_degradation
+)
+from structure import table_structure_extractor
+from runtime.process_pool import (
+    PAGE_WORKERS, get_process_pool, discard_process_pool
+)
+from runtime import stage_cache
+from runtime.shared_pages import share_page, attach, release
+from runtime.result_cache import (
+    RESULT_CACHE_ENABLED, get_result_cache, hash_document, make_key
+)
+from pipeline.stages import (
+    Stage, StageRecorder, recording, current_recorder, run_stages,
+    format_summary, size_of
+)
 
 from utlis.logger import AppLogger
 
 logger = AppLogger()
 
+# Recognize text lines of all fallback tables in one OCR batch
+OCR_BATCH_MODE = os.environ.get("DOCUSTRUCT_OCR_BATCH", "0") == "1"
 
-def run_application(image):
+# OCR the page once and slice each fallback table's words out of it
+PAGE_OCR_MODE = os.environ.get("DOCUSTRUCT_PAGE_OCR", "0") == "1"
 
-    try:
-        start_time = time.time()
-        logger.clear()
+# Tables of one page extracted concurrently (1 = one after another)
+TABLE_WORKERS = int(os.environ.get("DOCUSTRUCT_TABLE_WORKERS", "1"))
 
-        logger.log("Execution started")
+# Bump whenever extraction logic changes, so cached results are recomputed
+PIPELINE_VERSION = "1"
 
-        # Layout Detection
-        logger.log("Layout Detection")
-        layout = detect_layout(image)
 
-        if not layout or not layout.has_table:
-            logger.log("No table detected in document")
-            return {"error": "No table detected in the document."}
+# ---------------------------------------------------
+# STAGES (route, pp_structure, ocr and structure are
+# HybridTableExtractor.stages)
+# ---------------------------------------------------
+def _clean_table(table, cleaner):
+    """
+    Clean a table and pad its rows to the same width.
+    """
+    table = cleaner.clean(table)
 
-        tables = layout.tables
-        logger.log(f"Tables detected: {len(tables)}")
+    max_cols = max(len(r) for r in table)
 
-        extractor = HybridTableExtractor()
-        cleaner = TableCleaner()
-        analyzer = ConfidenceAnalyzer()
-        exporter = ExcelExporter()
+    for r in table:
+        r.extend([""] * (max_cols - len(r)))
 
-        all_tables = []
-        all_results = []
-        scores = []
+    return table
+
+
+def _analyze_table(table, words, logical_rows, columns, analyzer):
+    return analyzer.analyze(
+        words=words,
+        logical_rows=logical_rows if logical_rows else table,
+        table_matrix=table,
+        columns=columns if columns else list(range(len(table[0])))
+    )
+
+
+def _export_tables(tables, excel_path):
+    ExcelExporter().export_multiple(tables, excel_path)
+
+
+layout_stage = Stage("layout", detect_layout)
+orientation_stage = Stage("orientation", page_needs_angle_cls)
+crop_stage = Stage("crop_deskew", extract_clean_table_with_transform)
+export_stage = Stage("export", _export_tables)
+
+clean_stage = Stage("clean", _clean_table)
+metrics_stage = Stage("metrics", _analyze_table)
+
+# after extraction, every table is cleaned and scored
+RESULT_STAGES = (
+    clean_stage.bind(("table", "cleaner"), "table"),
+    metrics_stage.bind(
+        ("table", "words", "logical_rows", "columns", "analyzer"), "metrics"
+    )
+)
+
+
+def build_table_result(result, cleaner, analyzer):
+    """
+    Clean one extracted table and score it.
+
+    Returns:
+        {table, metrics, engine, routing, degradations} or None for an empty table
+    """
+
+    engine = result.get("engine")
+    if not engine:
+        engine = "custom"
+
+    logger.log(f"Extraction engine used: {engine}")
+
+    if result.get("speculative_winner"):
+        logger.log(f"Speculative winner: {result['speculative_winner']}")
+
+    routing = result.get("routing")
+
+    if routing:
+        logger.log(
+            f"Routing: {routing['table_type']} table "
+            f"({routing['horizontal_lines']} horizontal / {routing['vertical_lines']} vertical lines) "
+            f"-> {routing['route']}"
+        )
+
+    degradations = result.get("degradations", [])
+
+    if degradations:
+        logger.log(f"Latency budget: degraded ({', '.join(degradations)})")
+
+    table = result.get("table", [])
+    words = result.get("words", [])
+    columns = result.get("columns", [])
+    logical_rows = result.get("logical_rows", [])
+
+    # LOG EXTRACTION DETAILS
+    logger.log("OCR Processing")
+    logger.log(f"OCR words detected: {len(words)}")
+
+    logger.log("Row Detection")
+    logger.log(f"Row segments detected: {len(logical_rows)}")
+
+    logger.log("Column Detection")
+    logger.log(f"Columns detected: {len(columns)}")
+
+    if not table:
+        logger.log("Empty table extracted")
+        return None
+
+    # CLEANING + METRICS
+    logger.log("Table Construction")
+
+    state = run_stages(RESULT_STAGES, {
+        "table": table,
+        "words": words,
+        "logical_rows": logical_rows,
+        "columns": columns,
+        "cleaner": cleaner,
+        "analyzer": analyzer
+    })
+
+    table = state["table"]
+    metrics = state["metrics"]
+
+    logger.log(f"Table size: {len(table)} rows x {len(table[0])} columns")
+    logger.log("Confidence Analysis")
+
+
+    if "pp_structure" in engine:
+
+        completeness = 1 - metrics["completeness_metrics"]["empty_cell_ratio"]
+
+        # STRUCTURE QUALITY
+        row_count = metrics["structure_metrics"]["logical_row_count"]
+        col_count = metrics["structure_metrics"]["column_count"]
+
+        structure_score = 1.0
+
+        if row_count < 2:
+            structure_score *= 0.5
+
+        if col_count < 2:
+            structure_score *= 0.5
+
+        # CONTENT CONSISTENCY
+        numeric_ratio = metrics["numeric_metrics"]["numeric_cell_ratio"]
+
+        # Ideal numeric ratio range (invoice tables)
+        if numeric_ratio < 0.05:
+            consistency_score = 0.5
+        elif numeric_ratio > 0.9:
+            consistency_score = 0.7
+        else:
+            consistency_score = 1.0
+
+        final_score = (
+            0.3 * completeness +
+            0.3 * structure_score +
+            0.3 * consistency_score
+        )
+
+        metrics["overall_score"] = round(final_score, 4)
+
+        # STATUS
+        if final_score > 0.9:
+            metrics["status"] = "High Reliability"
+        elif final_score > 0.75:
+            metrics["status"] = "Medium Reliability"
+        else:
+            metrics["status"] = "Low Reliability"
+
+
+    # LOG METRICS for Custom engine
+    logger.log("OCR Metrics")
+    logger.log(str(metrics["ocr_metrics"]))
+
+    logger.log("Structure Metrics")
+    logger.log(str(metrics["structure_metrics"]))
+
+    logger.log("Completeness Metrics")
+    logger.log(str(metrics["completeness_metrics"]))
+
+    logger.log("Numeric Metrics")
+    logger.log(str(metrics["numeric_metrics"]))
+
+    logger.log(f"Overall Score: {metrics['overall_score']}")
+    logger.log(f"Status: {metrics['status']}")
+
+    return {
+        "table": table,
+        "metrics": metrics,
+        "engine": engine,
+        "routing": routing,
+        "degradations": degradations
+    }
+
+
+def _notify(progress, stage, **info):
+    """
+    Report pipeline progress to an optional callback(stage, **info).
+    """
+    if progress is not None:
+        try:
+            progress(stage, **info)
+        except Exception as e:
+            logger.log(f"Progress callback failed: {str(e)}")
+
+
+def process_page(image, progress=None, budget=None):
+    """
+    Layout detection, cropping, extraction, cleaning and metrics
+    for a single page. Nothing is exported here.
+
+    Args:
+        budget: LatencyBudget of the document (a new one with the
+            configured limits by default)
+
+    Returns:
+        {
+            tables: list of {table, metrics, engine},
+            tables_detected, processing_time_sec,
+            error: None or reason the page produced nothing,
+            stage_metrics: per-stage timing of this page,
+            degradations: latency budget fallbacks used on this page,
+            router_stats / speculative_stats: counters of this page's
+                tables (absent when no table was detected)
+        }
+    """
+    if budget is None:
+        budget = LatencyBudget.for_document()
+
+    recorder = StageRecorder()
+
+    with recording(recorder):
+        page_result = _run_page_stages(image, progress, budget)
+
+    page_result["stage_metrics"] = recorder.summary()
+
+    return page_result
+
+
+def _run_page_stages(image, progress, budget):
+
+    start_time = time.time()
+
+    degradations = []
+
+    # Layout Detection
+    _notify(progress, "layout")
+    logger.log("Layout Detection")
+    layout = layout_stage(image)
+
+    if not layout or not layout.has_table:
+        logger.log("No table detected in document")
+        return {
+            "tables": [],
+            "tables_detected": 0,
+            "processing_time_sec": round(time.time() - start_time, 2),
+            "error": "No table detected in the document.",
+            "degradations": degradations
+        }
+
+    tables = layout.tables
+    logger.log(f"Tables detected: {len(tables)}")
+
+    # Out of time: only the largest table of the page is extracted
+    if len(tables) > 1 and budget.is_tight():
+        logger.log("Latency budget: extracting the main table only")
+        add_degradation(degradations, MAIN_TABLE_ONLY)
+        tables = [select_main_table(layout)]
+
+    # Adaptive direction classifier: decided once for the whole page
+    use_angle_cls = None
+
+    if ocr_engine.ANGLE_CLS_MODE == "adaptive":
+        # an extra text-detection pass per page, timed as its own stage
+        use_angle_cls = orientation_stage(image)
+
+        logger.log(f"Angle classifier for this page: {'on' if use_angle_cls else 'off'}")
+
+    extractor = HybridTableExtractor(use_angle_cls)
+    cleaner = TableCleaner()
+    analyzer = ConfidenceAnalyzer()
+
+    all_results = []
+
+    # Shared page-level OCR (runs only if a table needs it)
+    page_ocr = PageOCR(image, use_angle_cls) if PAGE_OCR_MODE else None
+
+    # -----------------------------------
+    # CROP TABLES
+    crops = []
+    word_sources = []
+
+    for idx, tbl in enumerate(tables):
+
+        if "bbox" not in tbl:
+            logger.log(f"Table {idx + 1}: bounding box missing, skipping table")
+            continue
+
+        table_img, transform = crop_stage(image, tbl["bbox"])
+
+        if table_img is None or table_img.size == 0:
+            logger.log(f"Table {idx + 1}: table image extraction failed")
+            continue
+
+        crops.append((idx, table_img))
+
+        if page_ocr is not None:
+            word_sources.append(
+                lambda t=transform, shape=table_img.shape: page_ocr.words_for(t, shape)
+            )
+        else:
+            word_sources.append(None)
 
-        # -----------------------------------
-        for idx, tbl in enumerate(tables):
+    # EXTRACTION (batched OCR across tables)
+    batched_results = None
 
-            logger.log(f"Processing table {idx + 1}")
+    if OCR_BATCH_MODE and crops:
+        logger.log("Table Extraction (batched OCR)")
+        batched_results = extractor.extract_many(
+            [img for _, img in crops],
+            word_sources=word_sources,
+            budget=budget.child(TABLE_BUDGET_SEC * len(crops))
+        )
 
-            if "bbox" not in tbl:
-                logger.log("Bounding box missing, skipping table")
-                continue
+    # -----------------------------------
+    _notify(progress, "extraction", tables=len(crops))
 
-            table_img = extract_clean_table(image, tbl["bbox"])
+    tasks = []
 
-            if table_img is None or table_img.size == 0:
-                logger.log("Table image extraction failed")
-                continue
+    for n, (idx, table_img) in enumerate(crops):
 
-            # EXTRACTION
+        if batched_results is not None:
+            tasks.append((idx, table_img, None, batched_results[n], True, budget))
+        else:
+            tasks.append((idx, table_img, word_sources[n], None, False, budget))
+
+    tools = (extractor, cleaner, analyzer)
+
+    if TABLE_WORKERS > 1 and len(tasks) > 1:
+
+        workers = min(TABLE_WORKERS, len(tasks))
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docustruct-table") as pool:
+
+            recorder = current_recorder()
+
+            futures = [
+                pool.submit(_process_table_captured, recorder, tools, *task)
+                for task in tasks
+            ]
+
+            # results and logs are merged in table order
+            for future in futures:
+
+                table_result, lines = future.result()
+                logger.extend(lines)
+
+                if table_result is not None:
+                    all_results.append(table_result)
+
+    else:
+
+        for task in tasks:
+
+            table_result = _process_table(tools, *task)
+
+            if table_result is not None:
+                all_results.append(table_result)
+
+    for table_result in all_results:
+        for name in table_result["degradations"]:
+            add_degradation(degradations, name)
+
+    return {
+        "tables": all_results,
+        "tables_detected": len(layout.tables),
+        "processing_time_sec": round(time.time() - start_time, 2),
+        "error": None if all_results else "No structured tables could be extracted.",
+        "degradations": degradations,
+        "router_stats": extractor.router_stats,
+        "speculative_stats": extractor.speculative_stats
+    }
+
+
+def _process_table(tools, idx, table_img, word_source, result, extracted, budget=None):
+    """
+    Extraction, cleaning and metrics for one table crop.
+    A failure only drops this table, never the page.
+
+    Each table gets its own DOCUSTRUCT_TABLE_BUDGET_SEC, bounded by
+    what is left of the document budget.
+    """
+    extractor, cleaner, analyzer = tools
+
+    logger.log(f"Processing table {idx + 1}")
+
+    try:
+        # EXTRACTION
+        if not extracted:
             logger.log("Table Extraction")
+            result = extractor.extract(
+                table_img,
+                ocr_words=word_source,
+                budget=budget.child() if budget is not None else None
+            )
 
-            result = extractor.extract(table_img)
+        if not result:
+            logger.log("Extraction failed for table")
+            return None
 
-            if not result:
-                logger.log("Extraction failed for table")
-                continue
+        return build_table_result(result, cleaner, analyzer)
 
-            engine = result.get("engine")
-            if not engine:
-                engine = "custom"
+    except Exception as e:
+        logger.log(f"Table {idx + 1} failed: {str(e)}")
+        return None
 
-            logger.log(f"Extraction engine used: {engine}")
 
-            table = result.get("table", [])
-            words = result.get("words", [])
-            columns = result.get("columns", [])
-            logical_rows = result.get("logical_rows", [])
+def _process_table_captured(recorder, tools, *task):
+    """
+    _process_table() for a worker thread, returning its log lines too.
+    Stage timings go to the page's recorder.
+    """
+    with logger.capture() as lines, recording(recorder):
+        table_result = _process_table(tools, *task)
 
-            # LOG EXTRACTION DETAILS
-            logger.log("OCR Processing")
-            logger.log(f"OCR words detected: {len(words)}")
+    return table_result, lines
 
-            logger.log("Row Detection")
-            logger.log(f"Row segments detected: {len(logical_rows)}")
 
-            logger.log("Column Detection")
-            logger.log(f"Columns detected: {len(columns)}")
+def _safe_process_page(image, progress=None, budget=None):
+    """
+    process_page() with failures isolated to the page.
+    """
+    try:
+        return process_page(image, progress, budget)
 
-            if not table:
-                logger.log("Empty table extracted")
-                continue
+    except Exception as e:
+        logger.log(f"System error: {str(e)}")
+        return {
+            "tables": [],
+            "tables_detected": 0,
+            "processing_time_sec": 0,
+            "error": "Unexpected system error occurred.",
+            "details": str(e)
+        }
 
-            # CLEANING
-            logger.log("Table Construction")
 
-            table = cleaner.clean(table)
+def _page_worker(page_number, page, budget=None):
+    """
+    Runs in a worker process: process one page and hand back its logs.
 
-            max_cols = max(len(r) for r in table)
+    `page` is a SharedPage descriptor, or the image itself when it
+    could not be placed in shared memory.
+    """
+    logger.clear()
 
-            for r in table:
-                r.extend([""] * (max_cols - len(r)))
+    with attach(page) as image:
+        page_result = _safe_process_page(image, budget=budget)
+        del image
 
-            logger.log(f"Table size: {len(table)} rows x {max_cols} columns")
+    return page_number, page_result, logger.get_logs()
 
-            # METRICS
-            logger.log("Confidence Analysis")
 
-            metrics = analyzer.analyze(
-                words=words,
-                logical_rows=logical_rows if logical_rows else table,
-                table_matrix=table,
-                columns=columns if columns else list(range(max_cols))
+def _page_count(pages):
+    try:
+        return len(pages)
+    except TypeError:
+        return None
+
+
+def _timed_pages(pages):
+    """
+    Iterate pages, recording rendering / decoding as the "load" stage.
+    """
+    iterator = iter(pages)
+    recorder = current_recorder()
+
+    while True:
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            image = next(iterator)
+        except StopIteration:
+            return
+
+        if recorder is not None:
+            recorder.add(
+                "load",
+                time.perf_counter() - wall_start,
+                time.process_time() - cpu_start,
+                0,
+                size_of(image)
             )
 
+        yield image
+
+
+def _process_pages(pages, workers, progress=None, budget=None):
+    """
+    Pull pages from `pages` on demand and process them in page order.
+    Only a bounded number of rendered pages is alive at any time.
 
+    The document budget only holds its start time and limits, so
+    worker processes receive it as a plain argument. Pages go through
+    shared memory: workers get a small descriptor, not a pickled array.
+    """
+    page_count = _page_count(pages)
 
-            if "pp_structure" in engine:
+    if workers <= 1 or page_count == 1:
 
-                completeness = 1 - metrics["completeness_metrics"]["empty_cell_ratio"]
+        page_results = []
 
-                # STRUCTURE QUALITY
-                row_count = metrics["structure_metrics"]["logical_row_count"]
-                col_count = metrics["structure_metrics"]["column_count"]
+        for page_number, image in enumerate(_timed_pages(pages), start=1):
+            if page_count != 1:
+                logger.log(f"Page {page_number}")
 
-                structure_score = 1.0
+            page_results.append(_safe_process_page(image, progress, budget))
+            _notify(progress, "page_done", page=page_number, pages=page_count)
 
-                if row_count < 2:
-                    structure_score *= 0.5
+        return page_results
 
-                if col_count < 2:
-                    structure_score *= 0.5
+    logger.log(f"Processing pages on {workers} worker processes")
 
-                # CONTENT CONSISTENCY
-                numeric_ratio = metrics["numeric_metrics"]["numeric_cell_ratio"]
+    pool = get_process_pool(workers)
 
-                # Ideal numeric ratio range (invoice tables)
-                if numeric_ratio < 0.05:
-                    consistency_score = 0.5
-                elif numeric_ratio > 0.9:
-                    consistency_score = 0.7
-                else:
-                    consistency_score = 1.0
+    # at most this many pages rendered / in flight at once
+    max_in_flight = workers * 2
+
+    pending = deque()
+    page_results = []
+
+    def collect(task):
+
+        future, block = task
+
+        try:
+            page_number, page_result, page_logs = future.result()
+        finally:
+            release(block)
+
+        logger.log(f"Page {page_number}")
+        logger.extend(page_logs, prefix="  ")
+
+        page_results.append(page_result)
+
+        _notify(progress, "page_done", page=page_number, pages=page_count)
+
+    try:
+        for page_number, image in enumerate(_timed_pages(pages), start=1):
+
+            page, block = share_page(image)
+            del image
+
+            pending.append((pool.submit(_page_worker, page_number, page, budget), block))
+
+            # collect in page order, whatever order workers finish in
+            while len(pending) >= max_in_flight:
+                collect(pending.popleft())
+
+        while pending:
+            collect(pending.popleft())
+
+    except BrokenProcessPool:
+        # a worker died: this document fails, the next one gets a new pool
+        discard_process_pool(pool)
+        raise
+
+    finally:
+        # pages of a failed document
+        for future, block in pending:
+            future.cancel()
+            release(block)
+
+    return page_results
+
+
+def pipeline_config():
+    """
+    Model versions and every setting that changes the extracted tables.
+    Part of the result cache key.
+    """
+    return {
+        "pipeline_version": PIPELINE_VERSION,
+        "layout": layout_model.model_version(),
+        "ocr": ocr_engine.model_version(),
+        "pp_structure": table_structure_extractor.model_version(),
+        "ocr_batch": OCR_BATCH_MODE,
+        "page_ocr": PAGE_OCR_MODE,
+        "pp_table_only": table_structure_extractor.PP_TABLE_ONLY,
+        "speculative": speculative.SPECULATIVE_MODE,
+        "table_router": (
+            table_router.ROUTER_MODE == "on" and table_router.PP_STRUCTURE_TYPES
+        )
+    }
+
+
+def run_document(pages, workers=None, progress=None, excel_path=None, use_cache=None):
+    """
+    Extract tables from every page of a document.
+
+    Args:
+        pages: any iterable of page images, e.g. a PageSource, which
+            renders pages lazily as the pipeline pulls them
+
+        progress: optional callback(stage, **info) for status reporting
+        excel_path: where to write the workbook (temp output.xlsx by default)
+        use_cache: reuse the stored result of an identical document
+            (DOCUSTRUCT_RESULT_CACHE by default)
+
+    Pages are spread over a process pool when workers > 1
+    (DOCUSTRUCT_PAGE_WORKERS by default) and merged in page order.
+    """
+    if use_cache is None:
+        use_cache = RESULT_CACHE_ENABLED
+
+    if excel_path is None:
+        temp_dir = tempfile.gettempdir()
+        excel_path = os.path.join(temp_dir, "output.xlsx")
 
-                final_score = (
-                    0.3 * completeness +
-                    0.3 * structure_score +
-                    0.3 * consistency_score
-                )
+    cache_key = None
 
-                metrics["overall_score"] = round(final_score, 4)
+    if use_cache:
+        try:
+            content_hash = hash_document(pages)
 
-                # STATUS
-                if final_score > 0.9:
-                    metrics["status"] = "High Reliability"
-                elif final_score > 0.75:
-                    metrics["status"] = "Medium Reliability"
-                else:
-                    metrics["status"] = "Low Reliability"
+            if content_hash is not None:
+                cache_key = make_key(content_hash, pipeline_config())
+                cached = get_result_cache().get(cache_key)
 
+                if cached is not None:
+                    return _restore_cached(cached, excel_path)
 
-            # LOG METRICS for Custom engine
-            logger.log("OCR Metrics")
-            logger.log(str(metrics["ocr_metrics"]))
+        except Exception as e:
+            logger.log(f"Result cache unavailable: {str(e)}")
+            cache_key = None
 
-            logger.log("Structure Metrics")
-            logger.log(str(metrics["structure_metrics"]))
+    result = _run_document(pages, workers, progress, excel_path)
 
-            logger.log("Completeness Metrics")
-            logger.log(str(metrics["completeness_metrics"]))
+    # a degraded result would be served even when time allows better
+    if cache_key is not None and "error" not in result and not result["metrics"]["degradations"]:
+        try:
+            with open(result["excel_path"], "rb") as f:
+                excel_bytes = f.read()
 
-            logger.log("Numeric Metrics")
-            logger.log(str(metrics["numeric_metrics"]))
+            stored = {k: v for k, v in result.items() if k != "excel_path"}
+            get_result_cache().put(cache_key, stored, excel_bytes)
 
-            logger.log(f"Overall Score: {metrics['overall_score']}")
-            logger.log(f"Status: {metrics['status']}")
+        except Exception as e:
+            logger.log(f"Result cache write failed: {str(e)}")
 
-            scores.append(metrics["overall_score"])
-            all_tables.append(table)
+    return result
 
-            all_results.append({
-                "table": table,
-                "metrics": metrics,
-                "engine": engine 
+
+def _restore_cached(cached, excel_path):
+    """
+    Rebuild a run_document() result from the cache, writing its Excel
+    file where this call expects it.
+    """
+    result, excel_bytes = cached
+
+    logger.clear()
+    logger.log("Result cache hit: returning stored extraction")
+
+    if excel_bytes:
+        with open(excel_path, "wb") as f:
+            f.write(excel_bytes)
+
+    result["excel_path"] = excel_path
+    result["cached"] = True
+
+    return result
+
+
+def _run_document(pages, workers, progress, excel_path):
+
+    try:
+        start_time = time.time()
+        logger.clear()
+
+        logger.log("Execution started")
+
+        workers = workers or PAGE_WORKERS
+
+        budget = LatencyBudget.for_document()
+
+        recorder = StageRecorder()
+
+        with recording(recorder):
+            page_results = _process_pages(pages, workers, progress, budget)
+
+        all_tables = []
+        all_results = []
+        scores = []
+        page_metrics = []
+        degradations = []
+        router_stats = table_router.new_router_stats()
+        speculative_stats = speculative.new_speculative_stats()
+
+        for page_number, page_result in enumerate(page_results, start=1):
+
+            for table_result in page_result["tables"]:
+                table_result["page"] = page_number
+
+                scores.append(table_result["metrics"]["overall_score"])
+                all_tables.append(table_result["table"])
+                all_results.append(table_result)
+
+            page_scores = [t["metrics"]["overall_score"] for t in page_result["tables"]]
+
+            page_metrics.append({
+                "page": page_number,
+                "tables_detected": page_result["tables_detected"],
+                "table_count": len(page_result["tables"]),
+                "average_score": (
+                    round(sum(page_scores) / len(page_scores), 4) if page_scores else 0
+                ),
+                "processing_time_sec": page_result["processing_time_sec"],
+                "error": page_result["error"],
+                "stage_metrics": page_result.get("stage_metrics", {}),
+                "degradations": page_result.get("degradations", [])
             })
 
+            for name in page_result.get("degradations", []):
+                add_degradation(degradations, name)
+
+            # counted in the page's own process, so summed here
+            table_router.add_router_stats(router_stats, page_result.get("router_stats", {}))
+            speculative.add_speculative_stats(speculative_stats, page_result.get("speculative_stats", {}))
+
+            recorder.merge(page_result.get("stage_metrics", {}))
+
         # VALIDATION
+        failed = [p for p in page_results if "details" in p]
+
+        if failed and len(failed) == len(page_results):
+            return {
+                "error": "Unexpected system error occurred.",
+                "details": failed[0]["details"]
+            }
+
+        if not any(p["tables_detected"] for p in page_results):
+            return {"error": "No table detected in the document."}
+
         if not all_tables:
             logger.log("No valid structured tables generated")
             return {"error": "No structured tables could be extracted."}
 
         # AGGREGATION
+        _notify(progress, "aggregation")
         logger.log("Result Aggregation")
 
         avg_score = sum(scores) / len(scores)
 
         combined_metrics = {
+            "page_count": len(page_results),
             "table_count": len(all_tables),
             "average_score": round(avg_score, 4),
             "status": (
@@ -203,22 +807,47 @@ def run_application(image):
                 "Medium Reliability" if avg_score > 0.75 else
                 "Low Reliability"
             ),
-            "processing_time_sec": round(time.time() - start_time, 2)
+            "processing_time_sec": round(time.time() - start_time, 2),
+            "degradations": degradations
         }
 
+        if budget.limited or TABLE_BUDGET_SEC > 0:
+            combined_metrics["latency_budget"] = dict(
+                budget.describe(), table_budget_sec=TABLE_BUDGET_SEC
+            )
+
         logger.log(f"Total tables processed: {len(all_tables)}")
         logger.log(f"Average score: {combined_metrics['average_score']}")
         logger.log(f"Final status: {combined_metrics['status']}")
+        logger.log(f"Angle classifier usage: {get_angle_cls_stats()}")
+
+        if degradations:
+            logger.log(f"Latency budget degradations: {', '.join(degradations)}")
+
+        if table_router.ROUTER_MODE != "off":
+            logger.log(f"Table router: {table_router.summarize_router_stats(router_stats)}")
+
+        if speculative.SPECULATIVE_MODE:
+            logger.log(f"Speculative engines: {speculative.summarize_speculative_stats(speculative_stats)}")
+
+        if stage_cache.STAGE_CACHE_ENABLED:
+            logger.log(f"Stage cache usage: {stage_cache.stage_cache_stats()}")
 
         # EXPORT
+        _notify(progress, "export")
         logger.log("Excel Export")
 
-        temp_dir = tempfile.gettempdir()
-        excel_path = os.path.join(temp_dir, "output.xlsx")
-
-        exporter.export_multiple(all_tables, excel_path)
+        with recording(recorder):
+            export_stage(all_tables, excel_path)
 
         logger.log("Excel file generated successfully")
+
+        stage_metrics = recorder.summary()
+
+        logger.log("Stage Timing")
+        for line in format_summary(stage_metrics):
+            logger.log(line)
+
         logger.log("Execution completed")
 
         print("\n")
@@ -227,7 +856,9 @@ def run_application(image):
             "table": all_tables[0],
             "excel_path": excel_path,
             "metrics": combined_metrics,
-            "all_tables_metrics": all_results
+            "all_tables_metrics": all_results,
+            "page_metrics": page_metrics,
+            "stage_metrics": stage_metrics
         }
 
     except Exception as e:
@@ -238,3 +869,10 @@ def run_application(image):
             "error": "Unexpected system error occurred.",
             "details": str(e)
         }
+
+
+def run_application(image):
+    """
+    Single-page entry point used by the Streamlit app.
+    """
+    return run_document([image], workers=1)
@@ -0,0 +1,141 @@
+"""
+Evaluation of the page-level check behind DOCUSTRUCT_OCR_ANGLE_CLS=adaptive.
+
+Every invoice page is checked upright and rotated by 90, 180 and 270
+degrees. An upright page should skip the direction classifier, a
+rotated one must not. Reports the skip rate on upright pages (the
+saving), the miss rate on rotated pages (the risk) and the accuracy,
+and exits non-zero if too many rotated pages would be missed.
+
+The check itself is an extra text-detection pass per page, so its
+latency is reported next to what the classifier costs on the upright
+page (full OCR with minus without the classifier): adaptive mode only
+pays off when the check is cheaper than the classifier times the
+skip rate.
+
+Usage (from the repo root):
+    python -m benchmarks.angle_cls_eval eval_invoices/*.jpg --min-recall 0.99
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+import cv2
+
+from preprocessing.image_cleaner import load_image
+from runtime.engine_pool import get_pool
+from ocr.ocr_engine import OCR_MODEL_NAME, page_orientation
+
+
+ROTATIONS = {
+    0: None,
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE
+}
+
+
+def check_page(ocr_model, page):
+    """
+    Returns:
+        (classifier needed, check latency in seconds)
+    """
+    start = time.perf_counter()
+    orientation = page_orientation(ocr_model, page)
+    elapsed = time.perf_counter() - start
+
+    return orientation["rotated_90"] or orientation["flipped_180"], elapsed
+
+
+def classifier_cost(ocr_model, page):
+    """
+    Seconds the direction classifier adds to OCR of the whole page.
+    """
+    start = time.perf_counter()
+    ocr_model.ocr(page, cls=False)
+    without = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ocr_model.ocr(page, cls=True)
+    with_cls = time.perf_counter() - start
+
+    return with_cls - without
+
+
+def summarize(decisions):
+    """
+    decisions: list of (rotation, classifier needed)
+    """
+    upright = [needed for rotation, needed in decisions if rotation == 0]
+    rotated = [needed for rotation, needed in decisions if rotation != 0]
+
+    correct = sum(1 for rotation, needed in decisions if needed == (rotation != 0))
+
+    return {
+        "pages": len(upright),
+        "skip_rate_upright": round(upright.count(False) / max(len(upright), 1), 4),
+        "recall_rotated": round(rotated.count(True) / max(len(rotated), 1), 4),
+        "miss_rate_rotated": round(rotated.count(False) / max(len(rotated), 1), 4),
+        "accuracy": round(correct / max(len(decisions), 1), 4)
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("images", nargs="+", help="Upright invoice pages")
+    parser.add_argument("--min-recall", type=float, default=0.99,
+                        help="Share of rotated pages that must get the classifier")
+    args = parser.parse_args()
+
+    images = [load_image(path) for path in args.images]
+
+    decisions = []
+    latencies = []
+    cls_costs = []
+    per_rotation = {rotation: [] for rotation in ROTATIONS}
+
+    with get_pool(OCR_MODEL_NAME).lease() as ocr_model:
+
+        for image in images:
+
+            cls_costs.append(classifier_cost(ocr_model, image))
+
+            for rotation, code in ROTATIONS.items():
+
+                page = image if code is None else cv2.rotate(image, code)
+
+                needed, elapsed = check_page(ocr_model, page)
+
+                decisions.append((rotation, needed))
+                latencies.append(elapsed)
+                per_rotation[rotation].append(needed)
+
+    summary = summarize(decisions)
+
+    print("\nCLASSIFIER NEEDED, PER ROTATION")
+    for rotation, values in per_rotation.items():
+        print(f"{rotation:>3} deg : {values.count(True)}/{len(values)}")
+
+    print("\nADAPTIVE ANGLE CLASSIFIER")
+    print(summary)
+
+    check_ms = statistics.median(latencies) * 1000
+    cls_ms = statistics.median(cls_costs) * 1000
+
+    print(f"check latency per page (median)   : {check_ms:.1f} ms")
+    print(f"classifier cost per page (median) : {cls_ms:.1f} ms")
+    print(f"net saving per upright page       : {cls_ms * summary['skip_rate_upright'] - check_ms:.1f} ms")
+
+    passed = summary["recall_rotated"] >= args.min_recall
+
+    print(f"\nRotation gate: {'PASS' if passed else 'FAIL'} "
+          f"(rotated pages classified >= {args.min_recall})")
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
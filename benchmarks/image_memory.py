@@ -0,0 +1,125 @@
+"""
+Peak memory of the per-table image path, measured with tracemalloc.
+
+Runs crop / deskew, line detection (router), OCR preprocessing and,
+with --ocr, PaddleOCR itself on every table, and reports the peak bytes
+allocated on top of the page by each step and by the whole table.
+numpy and OpenCV output arrays are traced; buffers internal to OpenCV
+and the OCR model are not.
+
+Usage (from the repo root):
+    python -m benchmarks.image_memory
+    python -m benchmarks.image_memory invoices/*.jpg --bbox 100,800,2400,2600 --ocr
+"""
+
+import argparse
+import statistics
+import tracemalloc
+
+from preprocessing.image_cleaner import load_image, preprocess_for_ocr
+from table_extraction.extractor import extract_clean_table_with_transform
+from structure.line_detector import detect_table_lines
+from runtime.warmup import build_synthetic_page
+
+
+def traced_peak(fn, *args):
+    """
+    Returns:
+        (fn result, peak bytes allocated while fn ran)
+    """
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+
+    result = fn(*args)
+
+    return result, tracemalloc.get_traced_memory()[1] - base
+
+
+def run_table(page, bbox, ocr, measure=None):
+    """
+    The image path of one table. With `measure`, each step is run
+    through it and its peak stored; otherwise steps run untraced.
+    """
+    peaks = {}
+
+    def step(name, fn, *args):
+        if measure is None:
+            return fn(*args)
+        result, peaks[name] = measure(fn, *args)
+        return result
+
+    table_img = step("crop_deskew", lambda: extract_clean_table_with_transform(page, bbox)[0])
+
+    step("route", detect_table_lines, table_img)
+
+    ocr_ready = step("preprocess", preprocess_for_ocr, table_img)
+
+    if ocr:
+        from ocr.ocr_engine import run_ocr
+        step("ocr", run_ocr, ocr_ready)
+
+    return table_img, peaks
+
+
+def table_peaks(page, bbox, ocr):
+    """
+    Peak bytes of each step, and of the whole table (measured in a
+    separate pass, as reset_peak() inside the steps would hide it).
+    """
+    _, peaks = run_table(page, bbox, ocr, measure=traced_peak)
+
+    (table_img, _), peaks["table"] = traced_peak(run_table, page, bbox, ocr)
+
+    return peaks, table_img
+
+
+def format_mb(n):
+    return f"{n / (1024 * 1024):8.2f} MB"
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("images", nargs="*", help="Invoice pages (a synthetic page by default)")
+    parser.add_argument("--bbox", help="Table box x1,y1,x2,y2 (whole page by default)")
+    parser.add_argument("--width", type=int, default=2480, help="Synthetic page width (A4 at 300 dpi)")
+    parser.add_argument("--height", type=int, default=3508)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--ocr", action="store_true", help="Include PaddleOCR (needs the model)")
+    args = parser.parse_args()
+
+    if args.images:
+        pages = []
+        for path in args.images:
+            page = load_image(path)
+            bbox = (
+                tuple(int(v) for v in args.bbox.split(","))
+                if args.bbox else (0, 0, page.shape[1], page.shape[0])
+            )
+            pages.append((page, bbox))
+    else:
+        pages = [build_synthetic_page(args.width, args.height)]
+
+    tracemalloc.start()
+
+    samples = {}
+
+    for page, bbox in pages:
+        for _ in range(args.runs):
+
+            peaks, table_img = table_peaks(page, bbox, args.ocr)
+
+            for step, peak in peaks.items():
+                samples.setdefault(step, []).append(peak)
+
+    tracemalloc.stop()
+
+    print(f"\nPEAK BYTES PER TABLE ({len(pages)} page(s) x {args.runs} runs)")
+    print(f"table crop          : {format_mb(table_img.nbytes)}  {table_img.shape}")
+
+    for step, values in samples.items():
+        print(f"{step:<20}: {format_mb(statistics.median(values))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Side-by-side benchmark of the torch and ONNX Runtime layout backends.
+
+Usage (from the repo root):
+    python -m benchmarks.layout_backends test_images/*.jpg --runs 5
+"""
+
+import argparse
+import statistics
+import time
+
+from preprocessing.image_cleaner import load_image
+from layout_detection.layout_model import load_layout_model, run_layout_model
+from metrics.layout_agreement import match_boxes, summarize_agreement
+
+
+def time_backend(model, images, runs):
+
+    # one untimed pass so lazy allocation is not counted
+    for image in images:
+        run_layout_model(model, image)
+
+    latencies = []
+    outputs = []
+
+    for _ in range(runs):
+        outputs = []
+        for image in images:
+            start = time.perf_counter()
+            outputs.append(run_layout_model(model, image))
+            latencies.append(time.perf_counter() - start)
+
+    return latencies, outputs
+
+
+def summarize_latency(latencies):
+
+    latencies = sorted(latencies)
+
+    return {
+        "median_ms": round(statistics.median(latencies) * 1000, 1),
+        "p90_ms": round(latencies[int(0.9 * (len(latencies) - 1))] * 1000, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1)
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("images", nargs="+", help="Invoice images or PDFs")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU for a box to count as agreeing")
+    args = parser.parse_args()
+
+    images = [load_image(path) for path in args.images]
+
+    print("Loading torch backend...")
+    torch_model = load_layout_model("torch")
+
+    print("Loading ONNX backend...")
+    onnx_model = load_layout_model("onnx")
+
+    torch_lat, torch_out = time_backend(torch_model, images, args.runs)
+    onnx_lat, onnx_out = time_backend(onnx_model, images, args.runs)
+
+    per_page = []
+
+    for ref, cand in zip(torch_out, onnx_out):
+        per_page.append(match_boxes(
+            [t["bbox"] for t in ref.tables],
+            [t["bbox"] for t in cand.tables],
+            iou_threshold=args.iou
+        ))
+
+    torch_stats = summarize_latency(torch_lat)
+    onnx_stats = summarize_latency(onnx_lat)
+
+    print("\nLATENCY PER PAGE")
+    print(f"torch : {torch_stats}")
+    print(f"onnx  : {onnx_stats}")
+    print(f"speedup (median): {torch_stats['median_ms'] / max(onnx_stats['median_ms'], 1e-6):.2f}x")
+
+    print("\nTABLE BOX AGREEMENT (onnx vs torch)")
+    print(summarize_agreement(per_page))
+
+
+if __name__ == "__main__":
+    main()
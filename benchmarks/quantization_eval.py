@@ -0,0 +1,74 @@
+"""
+Accuracy gate for the INT8 layout model.
+
+Compares table boxes of the INT8 model against the FP32 reference and
+exits non-zero if recall or mean IoU fall below the gate.
+
+Usage (from the repo root):
+    python -m benchmarks.quantization_eval eval_invoices/*.jpg --min-recall 0.97 --min-iou 0.9
+"""
+
+import argparse
+import sys
+
+from preprocessing.image_cleaner import load_image
+from layout_detection.layout_model import load_layout_model
+from metrics.layout_agreement import match_boxes, summarize_agreement
+from benchmarks.layout_backends import time_backend, summarize_latency
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("images", nargs="+", help="Held-out invoice pages (not the calibration set)")
+    parser.add_argument("--reference", choices=["torch", "onnx"], default="onnx",
+                        help="FP32 backend used as ground truth")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU for a box to count as found")
+    parser.add_argument("--min-recall", type=float, default=0.97)
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    args = parser.parse_args()
+
+    images = [load_image(path) for path in args.images]
+
+    fp32_model = load_layout_model(args.reference)
+    int8_model = load_layout_model("onnx_int8")
+
+    fp32_lat, fp32_out = time_backend(fp32_model, images, args.runs)
+    int8_lat, int8_out = time_backend(int8_model, images, args.runs)
+
+    per_page = []
+
+    for ref, cand in zip(fp32_out, int8_out):
+        per_page.append(match_boxes(
+            [t["bbox"] for t in ref.tables],
+            [t["bbox"] for t in cand.tables],
+            iou_threshold=args.iou
+        ))
+
+    agreement = summarize_agreement(per_page)
+
+    fp32_stats = summarize_latency(fp32_lat)
+    int8_stats = summarize_latency(int8_lat)
+
+    print("\nLATENCY PER PAGE")
+    print(f"fp32 ({args.reference}) : {fp32_stats}")
+    print(f"int8         : {int8_stats}")
+    print(f"speedup (median): {fp32_stats['median_ms'] / max(int8_stats['median_ms'], 1e-6):.2f}x")
+
+    print("\nTABLE BOX ACCURACY (int8 vs fp32)")
+    print(agreement)
+
+    passed = (
+        agreement["recall"] >= args.min_recall and
+        agreement["mean_iou"] >= args.min_iou
+    )
+
+    print(f"\nAccuracy gate: {'PASS' if passed else 'FAIL'} "
+          f"(recall >= {args.min_recall}, mean IoU >= {args.min_iou})")
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
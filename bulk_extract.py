@@ -0,0 +1,323 @@
+"""
+Bulk table extraction for directories or manifests of invoices.
+
+Each document gets <out>/<file name>.json (tables, metrics, stage_metrics,
+logs) and <out>/<file name>.xlsx, e.g. inv.pdf.json. Documents that already
+have a JSON are skipped unless they hit an unexpected error, so an
+interrupted backfill can simply be re-run. Every run writes its own
+<out>/summary-<timestamp>.json.
+
+Usage (from the repo root):
+    python bulk_extract.py invoices/ --out results/ --workers 4
+    python bulk_extract.py --manifest backfill.txt --out results/ --workers 8
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+
+from runtime.process_pool import get_process_pool
+
+
+DOCUMENT_EXTENSIONS = (".pdf", ".tif", ".tiff", ".jpg", ".jpeg", ".png")
+
+# Error of a crashed extraction (app_entry uses the same text); other
+# errors such as "No table detected" are final results, not retried
+UNEXPECTED_ERROR = "Unexpected system error occurred."
+
+
+# ---------------------------------------------------
+# INPUTS / OUTPUTS
+# ---------------------------------------------------
+def list_documents(input_dir):
+    """
+    All supported documents below `input_dir`, in a stable order.
+    """
+    paths = []
+
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if name.lower().endswith(DOCUMENT_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+
+    return sorted(paths)
+
+
+def read_manifest(manifest_path):
+    """
+    One document path per line; blank lines and # comments are ignored.
+    Relative paths are resolved against the manifest's directory.
+    """
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    paths = []
+
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+
+            if not line or line.startswith("#"):
+                continue
+
+            paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+
+    return paths
+
+
+def output_stem(path, root, out_dir):
+    """
+    Output path mirroring the input layout under `root`, so invoices with
+    the same file name in different folders do not overwrite each other.
+    The extension is kept (inv.pdf -> inv.pdf.json), so inv.pdf and
+    inv.png in one folder get separate outputs.
+    """
+    relative = os.path.relpath(os.path.abspath(path), root)
+    return os.path.join(out_dir, relative)
+
+
+def is_done(stem):
+    """
+    A document is done when its JSON exists, unless the extraction
+    crashed: those are retried on the next run. Documents without
+    tables stay done.
+    """
+    try:
+        with open(stem + ".json", encoding="utf-8") as f:
+            return json.load(f).get("error") != UNEXPECTED_ERROR
+    except (OSError, ValueError):
+        return False
+
+
+def _to_json(value):
+    # numpy scalars in metrics
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def write_json(path, data):
+    """
+    Write atomically: a crash never leaves a half-written file that
+    would be mistaken for a finished document.
+    """
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, default=_to_json)
+
+    os.replace(tmp_path, path)
+
+
+# ---------------------------------------------------
+# WORKER
+# ---------------------------------------------------
+def extract_document(path, stem, dpi=300):
+    """
+    Extract one document and write its JSON / Excel outputs.
+    Runs in a worker process; returns a small summary for the parent.
+    """
+    # imported here so the parent process never loads the models
+    from app_entry import run_document, logger
+    from preprocessing.page_source import PageSource
+
+    os.makedirs(os.path.dirname(stem) or ".", exist_ok=True)
+
+    start = time.perf_counter()
+
+    with logger.capture() as lines:
+        try:
+            result = run_document(
+                PageSource(path, dpi=dpi),
+                workers=1,
+                excel_path=stem + ".xlsx"
+            )
+        except Exception as e:
+            result = {"error": UNEXPECTED_ERROR, "details": str(e)}
+
+    stage_times = {
+        name: stats["wall_sec"]
+        for name, stats in result.get("stage_metrics", {}).items()
+    }
+
+    output = {
+        "source": path,
+        **result,
+        "logs": lines
+    }
+
+    write_json(stem + ".json", output)
+
+    return {
+        "path": path,
+        "error": result.get("error"),
+        "tables": result.get("metrics", {}).get("table_count", 0),
+        "pages": result.get("metrics", {}).get("page_count", 0),
+        "seconds": round(time.perf_counter() - start, 2),
+        "stage_times_sec": stage_times
+    }
+
+
+def crashed_document(path, stem, error):
+    """
+    Summary of a document whose worker died before it could write one.
+    Its JSON records the unexpected error, so the next run retries it.
+    """
+    os.makedirs(os.path.dirname(stem) or ".", exist_ok=True)
+
+    write_json(stem + ".json", {
+        "source": path,
+        "error": UNEXPECTED_ERROR,
+        "details": f"{type(error).__name__}: {error}"
+    })
+
+    return {
+        "path": path,
+        "error": UNEXPECTED_ERROR,
+        "tables": 0,
+        "pages": 0,
+        "seconds": 0.0,
+        "stage_times_sec": {}
+    }
+
+
+# ---------------------------------------------------
+# DRIVER
+# ---------------------------------------------------
+def run_bulk(jobs, workers=1, dpi=300, report=print):
+    """
+    Extract (path, stem) jobs on `workers` processes.
+
+    A worker that dies (segfault, OOM kill) breaks the whole pool: every
+    document still in flight is recorded as an unexpected error, to be
+    retried on the next run, and the rest continue on a new pool.
+
+    Returns:
+        summary dict with counts, throughput and per-stage totals
+    """
+    start = time.perf_counter()
+    summaries = []
+
+    def record(summary):
+        summaries.append(summary)
+
+        elapsed = time.perf_counter() - start
+        status = "ok" if summary["error"] is None else summary["error"]
+
+        report(
+            f"[{len(summaries)}/{len(jobs)}] {summary['path']} - {status}, "
+            f"{summary['tables']} tables, {summary['seconds']} sec "
+            f"({len(summaries) / elapsed:.2f} docs/sec)"
+        )
+
+    if workers <= 1:
+        for path, stem in jobs:
+            record(extract_document(path, stem, dpi))
+
+    else:
+        # bounded window: a manifest of 50k invoices is not submitted at once
+        max_in_flight = workers * 2
+        pending = deque()
+
+        def collect(task):
+            future, path, stem = task
+
+            try:
+                summary = future.result()
+            except Exception as e:
+                summary = crashed_document(path, stem, e)
+
+            record(summary)
+
+        for path, stem in jobs:
+
+            # a fresh pool if a worker crashed since the last submit
+            pool = get_process_pool(workers)
+
+            pending.append((pool.submit(extract_document, path, stem, dpi), path, stem))
+
+            while len(pending) >= max_in_flight:
+                collect(pending.popleft())
+
+        while pending:
+            collect(pending.popleft())
+
+    elapsed = time.perf_counter() - start
+
+    stage_totals = {}
+    for summary in summaries:
+        for stage, sec in summary["stage_times_sec"].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + sec
+
+    processed = len(summaries)
+
+    return {
+        "documents": processed,
+        "succeeded": sum(1 for s in summaries if s["error"] is None),
+        "no_tables": sum(
+            1 for s in summaries if s["error"] not in (None, UNEXPECTED_ERROR)
+        ),
+        "failed": sum(1 for s in summaries if s["error"] == UNEXPECTED_ERROR),
+        "pages": sum(s["pages"] for s in summaries),
+        "tables": sum(s["tables"] for s in summaries),
+        "elapsed_sec": round(elapsed, 2),
+        "docs_per_sec": round(processed / elapsed, 3) if elapsed > 0 else 0,
+        "stage_total_sec": {k: round(v, 2) for k, v in stage_totals.items()},
+        "stage_mean_sec": {
+            k: round(v / processed, 3) for k, v in stage_totals.items()
+        } if processed else {}
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("input_dir", nargs="?", help="Directory of invoices (searched recursively)")
+    parser.add_argument("--manifest", help="Text file with one document path per line")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--dpi", type=int, default=300, help="PDF rendering resolution")
+    parser.add_argument("--force", action="store_true", help="Re-run documents that are already done")
+    args = parser.parse_args()
+
+    if bool(args.input_dir) == bool(args.manifest):
+        parser.error("give either an input directory or --manifest")
+
+    if args.manifest:
+        paths = read_manifest(args.manifest)
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths]) if paths else "."
+    else:
+        paths = list_documents(args.input_dir)
+        root = os.path.abspath(args.input_dir)
+
+    jobs = [(path, output_stem(path, root, args.out)) for path in paths]
+
+    if not args.force:
+        todo = [(path, stem) for path, stem in jobs if not is_done(stem)]
+        print(f"Skipping {len(jobs) - len(todo)} documents already done")
+        jobs = todo
+
+    if not jobs:
+        print("Nothing to do")
+        return
+
+    print(f"Extracting {len(jobs)} documents on {args.workers} workers...")
+
+    summary = run_bulk(jobs, workers=args.workers, dpi=args.dpi)
+
+    # one file per run, so a partial re-run keeps earlier summaries
+    summary_name = time.strftime("summary-%Y%m%d-%H%M%S.json")
+    write_json(os.path.join(args.out, summary_name), summary)
+
+    print(f"Summary written to {os.path.join(args.out, summary_name)}")
+
+    print("\nSUMMARY")
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,20 @@
-import torch
-import streamlit as st  # type: ignore
-from ultralytics import YOLO
-import ultralytics.nn.tasks
+import os
 
-from huggingface_hub import hf_hub_download
+from runtime.model_registry import register_model
+from runtime.engine_pool import get_pool
+from runtime.result_cache import file_version
+from runtime.stage_cache import memoize
+from layout_detection.multiscale import (
+    downscale_for_detection,
+    rescale_tables,
+    refine_tables
+)
 
 # ---------------------------------------------------
 # SAFE LOAD FIX (YOLO)
 # ---------------------------------------------------
+# import torch
+# import ultralytics.nn.tasks
 # torch.serialization.add_safe_globals(
 #     [ultralytics.nn.tasks.DetectionModel]
 # )
@@ -23,16 +30,71 @@ HF_MODEL_FILENAME = "yolov8x-doclaynet-epoch64-imgsz640-initiallr1e-4-finallr1e-
 # LOCAL MODEL PATH 
 LOCAL_MODEL_PATH = "models/yolov8x-doclaynet-epoch64-imgsz640-initiallr1e-4-finallr1e-5.pt"
 
+# ONNX export of the same checkpoint (see layout_detection/onnx_backend.py)
+ONNX_MODEL_PATH = os.environ.get(
+    "DOCUSTRUCT_LAYOUT_ONNX_PATH",
+    os.path.splitext(LOCAL_MODEL_PATH)[0] + ".onnx"
+)
+
+# INT8 copy of the ONNX model (see layout_detection/quantization.py)
+INT8_MODEL_PATH = os.environ.get(
+    "DOCUSTRUCT_LAYOUT_INT8_PATH",
+    os.path.splitext(LOCAL_MODEL_PATH)[0] + ".int8.onnx"
+)
+
+# Inference backend: "torch" (ultralytics), "onnx" (ONNX Runtime FP32)
+# or "onnx_int8" (ONNX Runtime, quantized)
+LAYOUT_BACKEND = os.environ.get("DOCUSTRUCT_LAYOUT_BACKEND", "torch").lower()
+
+# Pages per forward pass in detect_layout_batch()
+LAYOUT_BATCH_SIZE = int(os.environ.get("DOCUSTRUCT_LAYOUT_BATCH_SIZE", "8"))
+
+# Longest page side fed to the detector (0 = full resolution).
+# The model runs at imgsz 640, so 300 dpi pages are mostly wasted pixels.
+LAYOUT_MAX_SIDE = int(os.environ.get("DOCUSTRUCT_LAYOUT_MAX_SIDE", "1280"))
+
+# Re-check table edges at full resolution after low-resolution detection
+LAYOUT_REFINE_EDGES = os.environ.get("DOCUSTRUCT_LAYOUT_REFINE", "0") == "1"
+
+# Minimum confidence for a detected table
+TABLE_CONF_THRESHOLD = 0.4
+
+# Layout model copies per process. The ultralytics predictor is not
+# thread-safe, so job threads and the warm-up take turns on one copy.
+LAYOUT_POOL_SIZE = int(os.environ.get("DOCUSTRUCT_LAYOUT_POOL_SIZE", "1"))
+
+
+# Name of the engine inside the model registry
+LAYOUT_MODEL_NAME = "layout"
+
 
 # ---------------------------------------------------
 # MODEL LOADING LOGIC
 # ---------------------------------------------------
-@st.cache_resource
-def load_layout_model():
+def load_layout_model(backend=None):
+    """
+    Build the YOLO layout model for the configured backend.
+
+    torch / ultralytics are imported here rather than at module level,
+    so importing this module stays cheap until a page is detected.
+    """
+    backend = (backend or LAYOUT_BACKEND).lower()
+
+    if backend == "onnx":
+        return load_onnx_layout_model()
+
+    if backend == "onnx_int8":
+        return load_int8_layout_model()
+
+    if backend != "torch":
+        raise ValueError(f"Unknown layout backend: {backend}")
+
+    from ultralytics import YOLO
 
     print("Loading layout detection model...")
 
     # OPTION 1: LOAD FROM HUGGING FACE (DEFAULT - DEPLOYMENT)
+    # from huggingface_hub import hf_hub_download
     # try:
     #     model_path = hf_hub_download(
     #         repo_id=HF_REPO_ID,
@@ -45,8 +107,6 @@ def load_layout_model():
     #     raise RuntimeError("Failed to download YOLO model from Hugging Face")
 
     # OPTION 2: LOAD LOCAL MODEL (FOR LOCAL USE ONLY)
-    
-    import os
 
     if os.path.exists(LOCAL_MODEL_PATH):
         model_path = LOCAL_MODEL_PATH
@@ -61,8 +121,61 @@ def load_layout_model():
     return model
 
 
-# Initialize model
-model = load_layout_model()
+def load_onnx_layout_model():
+
+    from layout_detection.onnx_backend import OnnxLayoutModel, export_onnx
+
+    print("Loading layout detection model (ONNX Runtime)...")
+
+    # Export once from the local checkpoint if no ONNX file exists yet
+    if not os.path.exists(ONNX_MODEL_PATH):
+        if not os.path.exists(LOCAL_MODEL_PATH):
+            raise FileNotFoundError("Local model file not found")
+        export_onnx(LOCAL_MODEL_PATH, ONNX_MODEL_PATH)
+
+    print(f"Model loaded locally: {ONNX_MODEL_PATH}")
+
+    return OnnxLayoutModel(ONNX_MODEL_PATH)
+
+
+def load_int8_layout_model():
+
+    from layout_detection.onnx_backend import OnnxLayoutModel
+
+    print("Loading layout detection model (ONNX Runtime, INT8)...")
+
+    # Quantization needs calibration pages, so it is never done implicitly
+    if not os.path.exists(INT8_MODEL_PATH):
+        raise FileNotFoundError(
+            "INT8 layout model not found, run: "
+            "python -m layout_detection.quantization --calibration-dir <pages>"
+        )
+
+    print(f"Model loaded locally: {INT8_MODEL_PATH}")
+
+    return OnnxLayoutModel(INT8_MODEL_PATH)
+
+
+# Loaded lazily on the first detect_layout() call, leased from a pool
+register_model(LAYOUT_MODEL_NAME, load_layout_model)
+
+
+def model_version():
+    """
+    Identity of the detector and every setting that changes its boxes.
+    """
+    model_path = {
+        "onnx": ONNX_MODEL_PATH,
+        "onnx_int8": INT8_MODEL_PATH
+    }.get(LAYOUT_BACKEND, LOCAL_MODEL_PATH)
+
+    return {
+        "backend": LAYOUT_BACKEND,
+        "model": file_version(model_path),
+        "max_side": LAYOUT_MAX_SIDE,
+        "refine": LAYOUT_REFINE_EDGES,
+        "conf_threshold": TABLE_CONF_THRESHOLD
+    }
 
 
 # ---------------------------------------------------
@@ -79,27 +192,36 @@ class LayoutResult:
 
 
 # ---------------------------------------------------
-# MAIN DETECTION FUNCTION
+# BACKEND OUTPUT -> DETECTIONS
 # ---------------------------------------------------
-def detect_layout(image):
+def _torch_detections(results):
     """
-    Detect tables using YOLO layout model
+    Convert one ultralytics Results object into (label, conf, xyxy) tuples.
     """
+    for box in results.boxes:
 
-    results = model(image)[0]
+        cls_id = int(box.cls[0])
+        label = results.names.get(cls_id, "")
+        conf = float(box.conf[0])
 
-    table_boxes = []
+        x1, y1, x2, y2 = box.xyxy[0]
+
+        yield label, conf, (float(x1), float(y1), float(x2), float(y2))
 
-    try:
-        for box in results.boxes:
 
-            cls_id = int(box.cls[0])
-            label = results.names.get(cls_id, "")
-            conf = float(box.conf[0])
+def _onnx_detections(detections):
+    for det in detections:
+        yield det["label"], det["confidence"], det["xyxy"]
 
-            if label.lower() == "table" and conf > 0.4:
 
-                x1, y1, x2, y2 = box.xyxy[0]
+def _to_layout_result(detections):
+
+    table_boxes = []
+
+    try:
+        for label, conf, (x1, y1, x2, y2) in detections:
+
+            if label.lower() == "table" and conf > TABLE_CONF_THRESHOLD:
 
                 table_boxes.append({
                     "bbox": (int(x1), int(y1), int(x2), int(y2)),
@@ -110,3 +232,110 @@ def detect_layout(image):
         print(f"Detection error: {e}")
 
     return LayoutResult(table_boxes)
+
+
+def run_layout_model(model, image):
+    """
+    Detect tables on one image with an already loaded model,
+    whichever backend it belongs to.
+    """
+    from layout_detection.onnx_backend import OnnxLayoutModel
+
+    if isinstance(model, OnnxLayoutModel):
+        return _to_layout_result(_onnx_detections(model.predict(image)))
+
+    results = model(image)[0]
+
+    return _to_layout_result(_torch_detections(results))
+
+
+def run_layout_model_batch(model, images):
+    """
+    Detect tables on several images in a single forward pass.
+    """
+    from layout_detection.onnx_backend import OnnxLayoutModel
+
+    if isinstance(model, OnnxLayoutModel):
+        return [
+            _to_layout_result(_onnx_detections(detections))
+            for detections in model.predict_batch(images)
+        ]
+
+    # ultralytics batches a list source into one forward pass
+    results = model(list(images))
+
+    return [_to_layout_result(_torch_detections(r)) for r in results]
+
+
+# ---------------------------------------------------
+# MAIN DETECTION FUNCTION
+# ---------------------------------------------------
+def detect_layout(image):
+    """
+    Detect tables using YOLO layout model
+    (memoized per page when DOCUSTRUCT_STAGE_CACHE=1)
+    """
+    return memoize(
+        "layout", image, model_version(),
+        lambda: _detect_layout(image),
+        encode=lambda layout: layout.tables,
+        decode=lambda tables: LayoutResult(
+            [{**t, "bbox": tuple(t["bbox"])} for t in tables]
+        )
+    )
+
+
+def _detect_layout(image):
+
+    small, scale = downscale_for_detection(image, LAYOUT_MAX_SIDE)
+
+    with get_pool(LAYOUT_MODEL_NAME, LAYOUT_POOL_SIZE).lease() as model:
+        layout = run_layout_model(model, small)
+
+    return _to_full_resolution(image, layout, scale)
+
+
+def _to_full_resolution(image, layout, scale):
+    """
+    Map boxes found on the downscaled page back onto the original page.
+    """
+    if scale == 1.0:
+        return layout
+
+    tables = rescale_tables(layout.tables, scale, image.shape)
+
+    if LAYOUT_REFINE_EDGES:
+        tables = refine_tables(image, tables)
+
+    return LayoutResult(tables)
+
+
+def detect_layout_batch(images, batch_size=LAYOUT_BATCH_SIZE):
+    """
+    Detect tables on many pages, `batch_size` pages per forward pass.
+
+    Returns:
+        One LayoutResult per input image, in input order
+    """
+
+    images = list(images)
+
+    if not images:
+        return []
+
+    batch_size = max(1, batch_size)
+
+    layouts = []
+
+    for start in range(0, len(images), batch_size):
+
+        batch = images[start:start + batch_size]
+        scaled = [downscale_for_detection(image, LAYOUT_MAX_SIDE) for image in batch]
+
+        with get_pool(LAYOUT_MODEL_NAME, LAYOUT_POOL_SIZE).lease() as model:
+            results = run_layout_model_batch(model, [small for small, _ in scaled])
+
+        for image, (_, scale), layout in zip(batch, scaled, results):
+            layouts.append(_to_full_resolution(image, layout, scale))
+
+    return layouts
@@ -0,0 +1,126 @@
+import cv2
+import numpy as np
+
+
+def downscale_for_detection(image, max_side):
+    """
+    Shrink a page so its longest side is at most `max_side` pixels.
+
+    The detector works at imgsz 640, so a 300 dpi page (~2500x3500)
+    carries far more pixels than it can use.
+
+    Returns:
+        (small_image, scale) where scale = small / original
+    """
+    h, w = image.shape[:2]
+    longest = max(h, w)
+
+    if not max_side or longest <= max_side:
+        return image, 1.0
+
+    scale = max_side / longest
+
+    # INTER_AREA averages pixels, avoiding aliasing on thin table rules
+    small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    return small, scale
+
+
+def rescale_tables(tables, scale, image_shape):
+    """
+    Map table bboxes detected on a downscaled page back to full resolution.
+    """
+    if scale == 1.0:
+        return tables
+
+    h, w = image_shape[:2]
+
+    rescaled = []
+
+    for tbl in tables:
+
+        x1, y1, x2, y2 = tbl["bbox"]
+
+        rescaled.append({
+            **tbl,
+            "bbox": (
+                max(0, int(x1 / scale)),
+                max(0, int(y1 / scale)),
+                min(w, int(round(x2 / scale))),
+                min(h, int(round(y2 / scale)))
+            )
+        })
+
+    return rescaled
+
+
+def _edge_position(profile, inside_first, min_ink):
+    """
+    Index of the outermost band position with ink, scanning from the
+    outside of the box inwards. None if the band is empty.
+    """
+    order = range(len(profile)) if not inside_first else range(len(profile) - 1, -1, -1)
+
+    for i in order:
+        if profile[i] >= min_ink:
+            return i
+
+    return None
+
+
+def refine_bbox(image, bbox, margin=24, min_ink=3):
+    """
+    Re-check the four edges of a table box at full resolution.
+
+    Only thin bands of +-margin pixels around each edge are examined.
+    Each edge snaps outwards to the outermost ink inside its band, so a
+    box that was cut short by the low-resolution pass recovers the
+    missing border or text.
+    """
+    if len(image.shape) == 3:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = image
+
+    h, w = gray.shape[:2]
+    x1, y1, x2, y2 = bbox
+
+    def ink(region, axis):
+        if region.size == 0:
+            return np.zeros(0)
+        return (region < 128).sum(axis=axis)
+
+    # LEFT: band of columns around x1, scanned from outside (left) inwards
+    lx1, lx2 = max(0, x1 - margin), min(w, x1 + margin)
+    pos = _edge_position(ink(gray[y1:y2, lx1:lx2], 0), False, min_ink)
+    new_x1 = lx1 + pos if pos is not None else x1
+
+    # RIGHT: scanned from outside (right) inwards
+    rx1, rx2 = max(0, x2 - margin), min(w, x2 + margin)
+    pos = _edge_position(ink(gray[y1:y2, rx1:rx2], 0), True, min_ink)
+    new_x2 = rx1 + pos + 1 if pos is not None else x2
+
+    # TOP
+    ty1, ty2 = max(0, y1 - margin), min(h, y1 + margin)
+    pos = _edge_position(ink(gray[ty1:ty2, x1:x2], 1), False, min_ink)
+    new_y1 = ty1 + pos if pos is not None else y1
+
+    # BOTTOM
+    by1, by2 = max(0, y2 - margin), min(h, y2 + margin)
+    pos = _edge_position(ink(gray[by1:by2, x1:x2], 1), True, min_ink)
+    new_y2 = by1 + pos + 1 if pos is not None else y2
+
+    # never let refinement shrink a box past its original extent
+    return (
+        min(x1, new_x1),
+        min(y1, new_y1),
+        max(x2, new_x2),
+        max(y2, new_y2)
+    )
+
+
+def refine_tables(image, tables, margin=24):
+    return [
+        {**tbl, "bbox": refine_bbox(image, tbl["bbox"], margin)}
+        for tbl in tables
+    ]
@@ -0,0 +1,270 @@
+import ast
+import os
+
+import cv2
+import numpy as np
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# Same defaults as ultralytics predict(), so both backends agree
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+
+# Letterbox fill value used by ultralytics
+PAD_VALUE = 114
+
+
+# ---------------------------------------------------
+# EXPORT
+# ---------------------------------------------------
+def export_onnx(pt_path, onnx_path=None, imgsz=640, opset=12):
+    """
+    Export the ultralytics YOLO checkpoint to ONNX.
+
+    The batch dimension is exported as dynamic so one session can
+    serve single pages and batches.
+
+    Returns:
+        Path of the written .onnx file
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(pt_path)
+
+    exported = model.export(
+        format="onnx",
+        imgsz=imgsz,
+        opset=opset,
+        dynamic=True,
+        simplify=True
+    )
+
+    if onnx_path and os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+        exported = onnx_path
+
+    print(f"ONNX model exported: {exported}")
+
+    return exported
+
+
+# ---------------------------------------------------
+# PRE-PROCESSING
+# ---------------------------------------------------
+def letterbox(image, imgsz=(640, 640)):
+    """
+    Resize keeping aspect ratio and pad to the model input size.
+
+    Returns:
+        (padded_image, ratio, (pad_x, pad_y))
+    """
+    h, w = image.shape[:2]
+    new_h, new_w = imgsz
+
+    ratio = min(new_h / h, new_w / w)
+
+    resized_w = int(round(w * ratio))
+    resized_h = int(round(h * ratio))
+
+    if (resized_w, resized_h) != (w, h):
+        image = cv2.resize(image, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+
+    pad_x = (new_w - resized_w) / 2
+    pad_y = (new_h - resized_h) / 2
+
+    top = int(round(pad_y - 0.1))
+    bottom = int(round(pad_y + 0.1))
+    left = int(round(pad_x - 0.1))
+    right = int(round(pad_x + 0.1))
+
+    padded = cv2.copyMakeBorder(
+        image, top, bottom, left, right,
+        cv2.BORDER_CONSTANT,
+        value=(PAD_VALUE, PAD_VALUE, PAD_VALUE)
+    )
+
+    return padded, ratio, (left, top)
+
+
+def preprocess_image(image, imgsz=(640, 640)):
+    """
+    BGR uint8 image -> (1, 3, H, W) float32 RGB blob in [0, 1].
+
+    Returns:
+        (blob, ratio, pad)
+    """
+    if len(image.shape) == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+    padded, ratio, pad = letterbox(image, imgsz)
+
+    blob = cv2.dnn.blobFromImage(padded, scalefactor=1 / 255.0, swapRB=True)
+
+    return blob, ratio, pad
+
+
+# ---------------------------------------------------
+# ONNX RUNTIME MODEL
+# ---------------------------------------------------
+class OnnxLayoutModel:
+    """
+    YOLOv8 layout detector running on ONNX Runtime.
+
+    Handles letterboxing, decoding of the raw (4 + classes) x anchors
+    output, class-aware NMS and rescaling boxes to the original image.
+    """
+
+    def __init__(self, model_path, providers=None, num_threads=0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        # 0 lets ONNX Runtime use all physical cores
+        options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(
+            model_path,
+            options,
+            providers=providers or ["CPUExecutionProvider"]
+        )
+
+        self.input_name = self.session.get_inputs()[0].name
+
+        meta = self.session.get_modelmeta().custom_metadata_map
+
+        # ultralytics stores class names / imgsz as python literals
+        self.names = ast.literal_eval(meta["names"]) if "names" in meta else {}
+
+        imgsz = ast.literal_eval(meta["imgsz"]) if "imgsz" in meta else [640, 640]
+        self.imgsz = (int(imgsz[0]), int(imgsz[1]))
+
+    # ---------------------------------------------------
+    # PRE-PROCESSING
+    # ---------------------------------------------------
+    def letterbox(self, image):
+        return letterbox(image, self.imgsz)
+
+    def preprocess(self, image):
+        return preprocess_image(image, self.imgsz)
+
+    # ---------------------------------------------------
+    # POST-PROCESSING
+    # ---------------------------------------------------
+    def postprocess(self, output, ratio, pad, orig_shape,
+                    conf_threshold=CONF_THRESHOLD, iou_threshold=IOU_THRESHOLD):
+        """
+        Decode one image worth of raw YOLOv8 output.
+
+        Args:
+            output: array of shape (4 + num_classes, num_anchors)
+
+        Returns:
+            List of dicts {label, class_id, confidence, xyxy}
+        """
+        preds = output.T
+
+        scores_all = preds[:, 4:]
+        class_ids = scores_all.argmax(axis=1)
+        scores = scores_all[np.arange(len(preds)), class_ids]
+
+        keep = scores > conf_threshold
+
+        if not np.any(keep):
+            return []
+
+        preds = preds[keep]
+        scores = scores[keep]
+        class_ids = class_ids[keep]
+
+        # xywh (center) -> xyxy in letterboxed space
+        cx, cy, bw, bh = preds[:, 0], preds[:, 1], preds[:, 2], preds[:, 3]
+        boxes = np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+
+        # class-aware NMS: shift each class into its own coordinate range
+        offsets = class_ids[:, None].astype(np.float32) * 7680
+        shifted = boxes + offsets
+
+        nms_boxes = [
+            [float(b[0]), float(b[1]), float(b[2] - b[0]), float(b[3] - b[1])]
+            for b in shifted
+        ]
+
+        indices = cv2.dnn.NMSBoxes(
+            nms_boxes,
+            scores.astype(float).tolist(),
+            conf_threshold,
+            iou_threshold
+        )
+
+        if len(indices) == 0:
+            return []
+
+        indices = np.array(indices).reshape(-1)
+
+        # highest scores first, capped like ultralytics
+        indices = indices[np.argsort(-scores[indices])][:MAX_DETECTIONS]
+
+        # undo letterbox
+        pad_x, pad_y = pad
+        h, w = orig_shape[:2]
+
+        detections = []
+
+        for i in indices:
+
+            x1, y1, x2, y2 = boxes[i]
+
+            x1 = min(max((x1 - pad_x) / ratio, 0), w)
+            y1 = min(max((y1 - pad_y) / ratio, 0), h)
+            x2 = min(max((x2 - pad_x) / ratio, 0), w)
+            y2 = min(max((y2 - pad_y) / ratio, 0), h)
+
+            cls_id = int(class_ids[i])
+
+            detections.append({
+                "label": self.names.get(cls_id, ""),
+                "class_id": cls_id,
+                "confidence": float(scores[i]),
+                "xyxy": (float(x1), float(y1), float(x2), float(y2))
+            })
+
+        return detections
+
+    # ---------------------------------------------------
+    # INFERENCE
+    # ---------------------------------------------------
+    def predict(self, image):
+        """
+        Run detection on one BGR image.
+        """
+        blob, ratio, pad = self.preprocess(image)
+
+        output = self.session.run(None, {self.input_name: blob})[0]
+
+        return self.postprocess(output[0], ratio, pad, image.shape)
+
+    def predict_batch(self, images):
+        """
+        Run detection on several BGR images in one forward pass.
+
+        Returns:
+            One detection list per image, in input order
+        """
+        if not images:
+            return []
+
+        prepared = [self.preprocess(image) for image in images]
+
+        blob = np.concatenate([p[0] for p in prepared], axis=0)
+
+        outputs = self.session.run(None, {self.input_name: blob})[0]
+
+        return [
+            self.postprocess(output, ratio, pad, image.shape)
+            for output, (_, ratio, pad), image in zip(outputs, prepared, images)
+        ]
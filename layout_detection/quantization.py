@@ -0,0 +1,183 @@
+"""
+INT8 quantization of the ONNX layout detector.
+
+Usage (from the repo root):
+    python -m layout_detection.quantization --calibration-dir sample_invoices
+"""
+
+import argparse
+import glob
+import os
+
+from layout_detection.onnx_backend import preprocess_image
+
+
+# Ultralytics names the YOLOv8 detection head "/model.22/...". Its box
+# decoding (DFL softmax, concat, sigmoid) is very sensitive to INT8
+# rounding, so only the head convolutions are quantized.
+DETECT_HEAD_PREFIX = "/model.22/"
+
+# Image types accepted for calibration
+CALIBRATION_EXTENSIONS = (".png", ".jpg", ".jpeg", ".pdf", ".tif", ".tiff")
+
+
+def list_calibration_images(calibration_dir, limit=None):
+
+    paths = []
+
+    for ext in CALIBRATION_EXTENSIONS:
+        paths.extend(glob.glob(os.path.join(calibration_dir, f"*{ext}")))
+        paths.extend(glob.glob(os.path.join(calibration_dir, f"*{ext.upper()}")))
+
+    paths = sorted(set(paths))
+
+    return paths[:limit] if limit else paths
+
+
+def _make_calibration_reader(image_paths, input_name, imgsz):
+    """
+    Feed letterboxed invoice pages to the static quantizer, one at a time.
+    """
+    from onnxruntime.quantization import CalibrationDataReader
+    from preprocessing.image_cleaner import load_image
+
+    class InvoiceCalibrationReader(CalibrationDataReader):
+
+        def __init__(self):
+            self._paths = iter(image_paths)
+
+        def get_next(self):
+
+            for path in self._paths:
+                try:
+                    image = load_image(path)
+                except Exception as e:
+                    print(f"Skipping calibration image {path}: {e}")
+                    continue
+
+                blob, _, _ = preprocess_image(image, imgsz)
+                return {input_name: blob}
+
+            return None
+
+    return InvoiceCalibrationReader()
+
+
+def _head_nodes_to_exclude(model):
+
+    return [
+        node.name for node in model.graph.node
+        if node.name.startswith(DETECT_HEAD_PREFIX) and node.op_type != "Conv"
+    ]
+
+
+def quantize_layout_model(fp32_path, int8_path, calibration_images=None,
+                          mode="static", imgsz=(640, 640)):
+    """
+    Write an INT8 copy of the ONNX layout model.
+
+    Args:
+        fp32_path: exported FP32 ONNX model
+        int8_path: output path
+        calibration_images: sample invoice pages (required for "static")
+        mode: "static" (QDQ, calibrated activations) or "dynamic"
+              (weights only, no calibration data needed)
+
+    Returns:
+        int8_path
+    """
+    import onnx
+    from onnxruntime.quantization import (
+        QuantFormat,
+        QuantType,
+        CalibrationMethod,
+        quantize_dynamic,
+        quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    fp32_model = onnx.load(fp32_path)
+    input_name = fp32_model.graph.input[0].name
+    exclude = _head_nodes_to_exclude(fp32_model)
+
+    # shape inference + graph cleanup recommended before quantization
+    prepared_path = os.path.splitext(int8_path)[0] + ".prep.onnx"
+    quant_pre_process(fp32_path, prepared_path)
+
+    try:
+        if mode == "dynamic":
+            quantize_dynamic(
+                prepared_path,
+                int8_path,
+                weight_type=QuantType.QInt8,
+                nodes_to_exclude=exclude
+            )
+
+        elif mode == "static":
+            if not calibration_images:
+                raise ValueError("Static quantization needs calibration images")
+
+            print(f"Calibrating on {len(calibration_images)} pages...")
+
+            quantize_static(
+                prepared_path,
+                int8_path,
+                _make_calibration_reader(calibration_images, input_name, imgsz),
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                per_channel=True,
+                calibrate_method=CalibrationMethod.MinMax,
+                nodes_to_exclude=exclude
+            )
+
+        else:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+
+    finally:
+        if os.path.exists(prepared_path):
+            os.remove(prepared_path)
+
+    # keep class names / imgsz so OnnxLayoutModel can decode the output
+    int8_model = onnx.load(int8_path)
+    del int8_model.metadata_props[:]
+    int8_model.metadata_props.extend(fp32_model.metadata_props)
+    onnx.save(int8_model, int8_path)
+
+    print(f"INT8 model written: {int8_path}")
+
+    return int8_path
+
+
+def main():
+
+    from layout_detection.layout_model import (
+        LOCAL_MODEL_PATH,
+        ONNX_MODEL_PATH,
+        INT8_MODEL_PATH
+    )
+    from layout_detection.onnx_backend import export_onnx
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calibration-dir", help="Folder of sample invoice pages")
+    parser.add_argument("--limit", type=int, default=200, help="Max calibration pages")
+    parser.add_argument("--mode", choices=["static", "dynamic"], default="static")
+    parser.add_argument("--fp32", default=ONNX_MODEL_PATH)
+    parser.add_argument("--output", default=INT8_MODEL_PATH)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.fp32):
+        export_onnx(LOCAL_MODEL_PATH, args.fp32)
+
+    images = []
+
+    if args.mode == "static":
+        if not args.calibration_dir:
+            parser.error("--calibration-dir is required for static quantization")
+        images = list_calibration_images(args.calibration_dir, args.limit)
+
+    quantize_layout_model(args.fp32, args.output, images, mode=args.mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+def box_iou(a, b):
+    """
+    Intersection over union of two (x1, y1, x2, y2) boxes.
+    """
+    ix1 = max(a[0], b[0])
+    iy1 = max(a[1], b[1])
+    ix2 = min(a[2], b[2])
+    iy2 = min(a[3], b[3])
+
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+
+    area_a = max(0, a[2] - a[0]) * max(0, a[3] - a[1])
+    area_b = max(0, b[2] - b[0]) * max(0, b[3] - b[1])
+
+    union = area_a + area_b - inter
+
+    return inter / union if union > 0 else 0.0
+
+
+def match_boxes(reference, candidate, iou_threshold=0.5):
+    """
+    Greedy one-to-one matching of candidate boxes against reference boxes.
+
+    Returns:
+        {
+            matched, reference_count, candidate_count,
+            mean_iou, recall, precision
+        }
+    """
+    pairs = []
+
+    for i, ref in enumerate(reference):
+        for j, cand in enumerate(candidate):
+            iou = box_iou(ref, cand)
+            if iou >= iou_threshold:
+                pairs.append((iou, i, j))
+
+    # best overlaps first
+    pairs.sort(reverse=True)
+
+    used_ref = set()
+    used_cand = set()
+    ious = []
+
+    for iou, i, j in pairs:
+
+        if i in used_ref or j in used_cand:
+            continue
+
+        used_ref.add(i)
+        used_cand.add(j)
+        ious.append(iou)
+
+    matched = len(ious)
+
+    return {
+        "matched": matched,
+        "reference_count": len(reference),
+        "candidate_count": len(candidate),
+        "mean_iou": round(sum(ious) / matched, 4) if matched else 0.0,
+        "recall": round(matched / len(reference), 4) if reference else 1.0,
+        "precision": round(matched / len(candidate), 4) if candidate else 1.0
+    }
+
+
+def summarize_agreement(per_page):
+    """
+    Aggregate match_boxes() outputs over many pages.
+    """
+    reference = sum(p["reference_count"] for p in per_page)
+    candidate = sum(p["candidate_count"] for p in per_page)
+    matched = sum(p["matched"] for p in per_page)
+
+    iou_sum = sum(p["mean_iou"] * p["matched"] for p in per_page)
+
+    return {
+        "pages": len(per_page),
+        "matched": matched,
+        "reference_count": reference,
+        "candidate_count": candidate,
+        "mean_iou": round(iou_sum / matched, 4) if matched else 0.0,
+        "recall": round(matched / reference, 4) if reference else 1.0,
+        "precision": round(matched / candidate, 4) if candidate else 1.0
+    }
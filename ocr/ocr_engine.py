@@ -1,17 +1,219 @@
-import streamlit as st # type: ignore
-from paddleocr import PaddleOCR
+import os
+import threading
+
 import cv2
+import numpy as np
+
+from runtime.model_registry import register_model
+from runtime.engine_pool import get_pool
+from runtime.result_cache import package_version
+from runtime import stage_cache
+from runtime.stage_cache import memoize, stage_key, lookup, store
+
+# Name of the engine inside the model registry
+OCR_MODEL_NAME = "ocr"
+
+# Text-line crops per recognizer forward pass (PaddleOCR default is 6)
+OCR_REC_BATCH_SIZE = int(os.environ.get("DOCUSTRUCT_OCR_REC_BATCH_SIZE", "6"))
+
+# Score below which PaddleOCR drops a recognized line
+DEFAULT_DROP_SCORE = 0.5
+
+# Text direction classifier: "always", "never" or "adaptive"
+# (adaptive = once per page, only when the page looks rotated; low
+# confidence still triggers a retry with the classifier). Adaptive is
+# not yet validated on real invoices, see benchmarks/angle_cls_eval.py
+ANGLE_CLS_MODE = os.environ.get("DOCUSTRUCT_OCR_ANGLE_CLS", "always").lower()
+
+# Mean confidence below which adaptive mode retries with the classifier
+LOW_CONFIDENCE_RETRY = 0.75
+
+# Page orientation check: longest page side used for line detection,
+# lines sent to the direction classifier, and the classifier score
+# needed for a "180" vote (PaddleOCR's own cls_thresh)
+ORIENTATION_MAX_SIDE = 960
+ORIENTATION_SAMPLE_LINES = 8
+ORIENTATION_CLS_THRESH = 0.9
+
 
-@st.cache_resource
 def load_ocr_model():
+    # paddle is heavy, import only when the engine is actually built
+    from paddleocr import PaddleOCR
+
     return PaddleOCR(
         use_angle_cls=True,     # angle classification
         lang="en",              # English OCR
-        show_log=False          # disable verbose logging
+        show_log=False,         # disable verbose logging
+        rec_batch_num=OCR_REC_BATCH_SIZE
         # use_gpu=False,        # force CPU mode
         )
 
-ocr_model = load_ocr_model()
+# Instances are built lazily by the engine pool on first run_ocr() call
+register_model(OCR_MODEL_NAME, load_ocr_model)
+
+
+def model_version():
+    """
+    Identity of the OCR models and settings that change the words.
+    """
+    return {
+        "paddleocr": package_version("paddleocr"),
+        "angle_cls": ANGLE_CLS_MODE,
+        "drop_score": DEFAULT_DROP_SCORE
+    }
+
+
+# ---------------------------------------------------
+# ANGLE CLASSIFIER COUNTERS
+# ---------------------------------------------------
+_angle_cls_lock = threading.Lock()
+
+_angle_cls_stats = {
+    "images": 0,
+    "classified": 0,
+    "skipped": 0,
+    "pages_checked": 0,
+    "pages_rotated_90": 0,
+    "pages_flipped_180": 0,
+    "low_confidence_retries": 0,
+    "retries_improved": 0
+}
+
+
+def _count(key, n=1):
+    with _angle_cls_lock:
+        _angle_cls_stats[key] += n
+
+
+def get_angle_cls_stats():
+    """
+    How often the direction classifier ran or was skipped.
+    """
+    with _angle_cls_lock:
+        stats = dict(_angle_cls_stats)
+
+    stats["mode"] = ANGLE_CLS_MODE
+    stats["skip_rate"] = round(stats["skipped"] / stats["images"], 4) if stats["images"] else 0.0
+
+    return stats
+
+
+def reset_angle_cls_stats():
+    with _angle_cls_lock:
+        for key in _angle_cls_stats:
+            _angle_cls_stats[key] = 0
+
+
+def should_classify(use_cls=None):
+    """
+    Decide whether the direction classifier runs for one image.
+
+    Args:
+        use_cls: the page's decision from page_needs_angle_cls(), only
+            used in adaptive mode; without one the classifier runs
+    """
+    use_cls = _resolve_angle_cls(use_cls)
+
+    _count("images")
+    _count("classified" if use_cls else "skipped")
+
+    return use_cls
+
+
+def _resolve_angle_cls(use_cls=None):
+    if ANGLE_CLS_MODE == "always":
+        return True
+
+    if ANGLE_CLS_MODE == "never":
+        return False
+
+    return True if use_cls is None else bool(use_cls)
+
+
+# ---------------------------------------------------
+# PAGE ORIENTATION
+# ---------------------------------------------------
+def page_orientation(ocr_model, page):
+    """
+    Orientation of a page from its detected text lines.
+
+    - 90 / 270: most detected line boxes are taller than wide
+    - 180: the direction classifier, run on the widest lines, votes
+      "180" for most of them (an ink profile cannot see this case)
+
+    Returns:
+        {lines, rotated_90, flipped_180}
+    """
+    image = to_bgr(page)
+
+    h, w = image.shape[:2]
+    scale = ORIENTATION_MAX_SIDE / max(h, w)
+
+    if scale < 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    detected = ocr_model.ocr(image, det=True, rec=False, cls=False)
+    boxes = (detected[0] if detected else None) or []
+
+    if not boxes:
+        return {"lines": 0, "rotated_90": False, "flipped_180": False}
+
+    sizes = []
+
+    for box in boxes:
+        pts = np.array(box, dtype=np.float32)
+        box_w = max(np.linalg.norm(pts[0] - pts[1]), np.linalg.norm(pts[2] - pts[3]))
+        box_h = max(np.linalg.norm(pts[0] - pts[3]), np.linalg.norm(pts[1] - pts[2]))
+        sizes.append((box_w, box_h))
+
+    tall = sum(1 for box_w, box_h in sizes if box_h >= 1.5 * box_w)
+
+    # longest lines give the classifier the most text to judge
+    sample = sorted(
+        range(len(boxes)),
+        key=lambda i: -max(sizes[i])
+    )[:ORIENTATION_SAMPLE_LINES]
+
+    # crop_text_line turns vertical lines upright, leaving a 0 / 180 decision
+    crops = [crop_text_line(image, boxes[i]) for i in sample]
+
+    _, cls_res, _ = ocr_model.text_classifier(crops)
+
+    flips = sum(
+        1 for label, score in cls_res
+        if label == "180" and float(score) >= ORIENTATION_CLS_THRESH
+    )
+
+    return {
+        "lines": len(boxes),
+        "rotated_90": tall * 2 > len(boxes),
+        "flipped_180": flips * 2 > len(sample)
+    }
+
+
+def page_needs_angle_cls(page):
+    """
+    Adaptive mode: decide once per page whether OCR of its tables needs
+    the direction classifier. Every table on the page uses the answer.
+    """
+    with get_pool(OCR_MODEL_NAME).lease() as ocr_model:
+        orientation = page_orientation(ocr_model, page)
+
+    _count("pages_checked")
+
+    if orientation["rotated_90"]:
+        _count("pages_rotated_90")
+
+    if orientation["flipped_180"]:
+        _count("pages_flipped_180")
+
+    return orientation["rotated_90"] or orientation["flipped_180"]
+
+
+def mean_confidence(words):
+    if not words:
+        return 0.0
+    return sum(w["confidence"] for w in words) / len(words)
 
 def is_valid_word(word):
     """
@@ -85,12 +287,56 @@ def safe_parse_box(box):
     return min(xs), min(ys), max(xs), max(ys)
 
 
-def run_ocr(table_image):
+def build_word(box, text_info):
+    """
+    Turn one PaddleOCR (box, text_info) pair into a word dict,
+    or None if it is unusable.
+    """
+
+    # Safely parse box
+    box_coords = safe_parse_box(box)
+    if box_coords is None:
+        return None
+
+    x1, y1, x2, y2 = box_coords
+
+    # Safely parse text + confidence
+    text, conf = safe_parse_text_conf(text_info)
+
+    if not text.strip():
+        return None
+
+    word = {
+        "text": text.strip(),
+        "x1": x1,
+        "y1": y1,
+        "x2": x2,
+        "y2": y2,
+        "confidence": float(conf)
+    }
+
+    # Generic validation
+    if not is_valid_word(word):
+        return None
+
+    return word
+
+
+def to_bgr(image):
+    # Ensure image is in BGR format for PaddleOCR
+    if len(image.shape) == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    return image
+
+
+def run_ocr(table_image, use_cls=None):
     """
     Perform word-level OCR using PaddleOCR.
+    (memoized per image when DOCUSTRUCT_STAGE_CACHE=1)
 
     Args:
         table_image: Cropped and preprocessed table image 
+        use_cls: page decision for adaptive mode (see should_classify)
 
     Returns:
         List of dicts:
@@ -100,16 +346,45 @@ def run_ocr(table_image):
             confidence
         }
     """
+    return memoize(
+        "ocr", table_image, {**model_version(), "cls": _resolve_angle_cls(use_cls)},
+        lambda: _run_ocr(table_image, use_cls)
+    )
 
-    # Ensure image is in BGR format for PaddleOCR
-    if len(table_image.shape) == 2:
-        image = cv2.cvtColor(table_image, cv2.COLOR_GRAY2BGR)
-    else:
-        image = table_image.copy()
 
-    # Run OCR
-    results = ocr_model.ocr(image)
+def _run_ocr(table_image, use_cls=None):
+
+    # Ensure image is in BGR format for PaddleOCR; PaddleOCR only reads
+    # its input, so a BGR crop (possibly a view of the page) is passed as-is
+    image = to_bgr(table_image)
+
+    use_cls = should_classify(use_cls)
+
+    # Run OCR on an engine owned by this thread
+    with get_pool(OCR_MODEL_NAME).lease() as ocr_model:
+
+        words = parse_ocr_results(ocr_model.ocr(image, cls=use_cls))
+
+        # adaptive mode: low confidence may mean upside-down text
+        if (
+            ANGLE_CLS_MODE == "adaptive" and not use_cls and words and
+            mean_confidence(words) < LOW_CONFIDENCE_RETRY
+        ):
+            _count("low_confidence_retries")
+
+            retry = parse_ocr_results(ocr_model.ocr(image, cls=True))
+
+            if mean_confidence(retry) > mean_confidence(words):
+                _count("retries_improved")
+                words = retry
+
+    return words
 
+
+def parse_ocr_results(results):
+    """
+    Convert raw PaddleOCR ocr() output into word dicts.
+    """
     words = []
 
     for line in results:
@@ -119,33 +394,189 @@ def run_ocr(table_image):
             if not isinstance(item, (list, tuple)) or len(item) < 2:
                 continue
 
-            box = item[0]
-            text_info = item[1]
+            word = build_word(item[0], item[1])
 
-            # Safely parse box
-            box_coords = safe_parse_box(box)
-            if box_coords is None:
-                continue
+            if word is not None:
+                words.append(word)
+
+    return words
+
+
+# ---------------------------------------------------
+# BATCHED RECOGNITION
+# ---------------------------------------------------
+def crop_text_line(image, box):
+    """
+    Perspective-crop one detected text line (4-point box) to a
+    horizontal strip, the same way PaddleOCR does before recognition.
+    """
+    pts = np.array(box, dtype=np.float32)
+
+    width = int(max(np.linalg.norm(pts[0] - pts[1]), np.linalg.norm(pts[2] - pts[3])))
+    height = int(max(np.linalg.norm(pts[0] - pts[3]), np.linalg.norm(pts[1] - pts[2])))
+
+    width = max(width, 1)
+    height = max(height, 1)
+
+    target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+
+    M = cv2.getPerspectiveTransform(pts, target)
+
+    crop = cv2.warpPerspective(
+        image, M, (width, height),
+        borderMode=cv2.BORDER_REPLICATE,
+        flags=cv2.INTER_CUBIC
+    )
+
+    # vertical strips are read rotated
+    if height / width >= 1.5:
+        crop = np.rot90(crop)
+
+    return crop
+
+
+def recognize_lines(ocr_model, crops, use_cls=True):
+    """
+    Recognize many text-line crops in as few recognizer calls as possible.
+
+    Returns:
+        List of (text, confidence) in input order
+    """
+    if not crops:
+        return []
+
+    if use_cls and getattr(ocr_model, "use_angle_cls", False):
+        crops, _, _ = ocr_model.text_classifier(crops)
+
+    rec_res, _ = ocr_model.text_recognizer(crops)
+
+    return rec_res
+
+
+def _recognize_adaptive(ocr_model, line_crops, line_cls):
+    """
+    Recognize lines, running the classifier only on lines that need it.
+    In adaptive mode, low-confidence lines are retried with the classifier.
+    """
+    rec_res = [None] * len(line_crops)
+
+    for use_cls in (True, False):
+
+        idx = [i for i, flag in enumerate(line_cls) if flag == use_cls]
+        if not idx:
+            continue
+
+        res = recognize_lines(ocr_model, [line_crops[i] for i in idx], use_cls=use_cls)
+
+        for i, r in zip(idx, res):
+            rec_res[i] = r
+
+    if ANGLE_CLS_MODE != "adaptive":
+        return rec_res
+
+    retry = [
+        i for i, flag in enumerate(line_cls)
+        if not flag and float(rec_res[i][1]) < LOW_CONFIDENCE_RETRY
+    ]
+
+    if retry:
+        _count("low_confidence_retries", len(retry))
+
+        res = recognize_lines(ocr_model, [line_crops[i] for i in retry], use_cls=True)
+
+        for i, r in zip(retry, res):
+            if float(r[1]) > float(rec_res[i][1]):
+                _count("retries_improved")
+                rec_res[i] = r
+
+    return rec_res
+
+
+def run_ocr_batch(table_images, use_cls=None):
+    """
+    Word-level OCR for many table crops with one shared recognition batch.
+
+    Text lines are detected per image, then every line crop from every
+    image goes through the recognizer together. Results are scattered
+    back into one word list per image, with the same schema as run_ocr().
+
+    Args:
+        table_images: list of cropped (and preprocessed) table images
+        use_cls: page decision for adaptive mode (see should_classify)
+
+    Returns:
+        List of word lists, one per input image
+    """
+    if not stage_cache.STAGE_CACHE_ENABLED:
+        return _run_ocr_batch(table_images, use_cls)
+
+    # only images missing from the OCR cache go through the batch
+    version = {**model_version(), "batched": True, "cls": _resolve_angle_cls(use_cls)}
+    keys = [stage_key("ocr", img, version) for img in table_images]
 
-            x1, y1, x2, y2 = box_coords
+    words_per_image = []
+    missing = []
 
-            # Safely parse text + confidence
-            text, conf = safe_parse_text_conf(text_info)
+    for i, key in enumerate(keys):
+        found, words = lookup("ocr", key)
+        words_per_image.append(words)
+        if not found:
+            missing.append(i)
 
-            if not text.strip():
+    if missing:
+        computed = _run_ocr_batch([table_images[i] for i in missing], use_cls)
+
+        for i, words in zip(missing, computed):
+            store("ocr", keys[i], words)
+            words_per_image[i] = words
+
+    return words_per_image
+
+
+def _run_ocr_batch(table_images, use_cls=None):
+
+    images = [to_bgr(img) for img in table_images]
+
+    words_per_image = [[] for _ in images]
+
+    line_crops = []
+    line_owner = []
+    line_cls = []
+
+    with get_pool(OCR_MODEL_NAME).lease() as ocr_model:
+
+        # STEP-1: detection per image
+        for idx, image in enumerate(images):
+
+            use_cls_image = should_classify(use_cls)
+
+            detected = ocr_model.ocr(image, det=True, rec=False, cls=False)
+            boxes = detected[0] if detected else None
+
+            if not boxes:
                 continue
 
-            word = {
-                "text": text.strip(),
-                "x1": x1,
-                "y1": y1,
-                "x2": x2,
-                "y2": y2,
-                "confidence": float(conf)
-            }
-
-            # Generic validation
-            if is_valid_word(word):
-                words.append(word)
+            for box in boxes:
+                line_crops.append(crop_text_line(image, box))
+                line_owner.append((idx, box))
+                line_cls.append(use_cls_image)
 
-    return words
+        # STEP-2: one recognition batch for all lines
+        rec_res = _recognize_adaptive(ocr_model, line_crops, line_cls)
+
+        drop_score = getattr(ocr_model, "drop_score", DEFAULT_DROP_SCORE)
+
+    # STEP-3: scatter back to the owning image
+    for (idx, box), text_info in zip(line_owner, rec_res):
+
+        text, conf = safe_parse_text_conf(tuple(text_info))
+
+        if conf < drop_score:
+            continue
+
+        word = build_word(box, (text, conf))
+
+        if word is not None:
+            words_per_image[idx].append(word)
+
+    return words_per_image
@@ -0,0 +1,166 @@
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from ocr.ocr_engine import run_ocr
+from preprocessing.image_cleaner import preprocess_for_ocr
+
+
+class WordIndex:
+    """
+    Uniform-grid spatial index over OCR words (page coordinates).
+    A word belongs to the cell that contains its center.
+    """
+
+    def __init__(self, words, cell_size=256):
+        self.cell_size = cell_size
+        self.words = words
+        self.cells = defaultdict(list)
+
+        for w in words:
+            cx = (w["x1"] + w["x2"]) / 2
+            cy = (w["y1"] + w["y2"]) / 2
+            self.cells[(int(cx // cell_size), int(cy // cell_size))].append(w)
+
+    def query(self, x1, y1, x2, y2):
+        """
+        Words whose center lies inside the (x1, y1, x2, y2) region.
+        """
+        cs = self.cell_size
+
+        found = []
+
+        for gx in range(int(x1 // cs), int(x2 // cs) + 1):
+            for gy in range(int(y1 // cs), int(y2 // cs) + 1):
+
+                for w in self.cells.get((gx, gy), []):
+
+                    cx = (w["x1"] + w["x2"]) / 2
+                    cy = (w["y1"] + w["y2"]) / 2
+
+                    if x1 <= cx < x2 and y1 <= cy < y2:
+                        found.append(w)
+
+        return found
+
+
+def _apply(transform, xs, ys):
+    pts = np.stack([xs, ys, np.ones_like(xs)], axis=0)
+    out = transform @ pts
+    return out[0], out[1]
+
+
+def slice_words(index, transform, crop_shape):
+    """
+    Words of one table, converted from page space to crop space.
+
+    Args:
+        index: WordIndex built on the full page
+        transform: 2x3 page -> crop affine matrix
+            (see extract_clean_table_with_transform)
+        crop_shape: shape of the table image
+
+    Returns:
+        List of word dicts in crop coordinates (run_ocr schema)
+    """
+    h, w = crop_shape[:2]
+
+    T = np.vstack([np.asarray(transform, dtype=np.float64), [0, 0, 1]])
+    inverse = np.linalg.inv(T)
+
+    # crop corners back in page space give the region to query
+    cx, cy = _apply(
+        inverse,
+        np.array([0, w, w, 0], dtype=np.float64),
+        np.array([0, 0, h, h], dtype=np.float64)
+    )
+
+    candidates = index.query(cx.min(), cy.min(), cx.max(), cy.max())
+
+    words = []
+
+    for word in candidates:
+
+        xs = np.array([word["x1"], word["x2"], word["x2"], word["x1"]], dtype=np.float64)
+        ys = np.array([word["y1"], word["y1"], word["y2"], word["y2"]], dtype=np.float64)
+
+        tx, ty = _apply(T, xs, ys)
+
+        center_x = tx.mean()
+        center_y = ty.mean()
+
+        # rotated crops are not axis-aligned in page space
+        if not (0 <= center_x < w and 0 <= center_y < h):
+            continue
+
+        x1 = int(max(0, tx.min()))
+        y1 = int(max(0, ty.min()))
+        x2 = int(min(w, tx.max()))
+        y2 = int(min(h, ty.max()))
+
+        if x2 <= x1 or y2 <= y1:
+            continue
+
+        words.append({
+            "text": word["text"],
+            "x1": x1,
+            "y1": y1,
+            "x2": x2,
+            "y2": y2,
+            "confidence": word["confidence"]
+        })
+
+    return words
+
+
+class PageOCR:
+    """
+    One OCR pass over a whole page, shared by every table on it.
+
+    OCR runs lazily on the first request for words, so pages where
+    every table is handled by PPStructure never pay for it.
+
+    Args:
+        use_cls: page decision for the direction classifier in adaptive
+            mode (see ocr_engine.page_needs_angle_cls)
+    """
+
+    def __init__(self, page, use_cls=None):
+        self.page = page
+        self.use_cls = use_cls
+        self._index = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = WordIndex(self._run())
+
+        return self._index
+
+    def _run(self):
+
+        ocr_ready = preprocess_for_ocr(self.page)
+
+        # preprocess_for_ocr may downscale wide pages
+        scale = ocr_ready.shape[1] / self.page.shape[1]
+
+        words = run_ocr(ocr_ready, self.use_cls)
+
+        if scale != 1.0:
+            for w in words:
+                w["x1"] = int(w["x1"] / scale)
+                w["y1"] = int(w["y1"] / scale)
+                w["x2"] = int(w["x2"] / scale)
+                w["y2"] = int(w["y2"] / scale)
+
+        print(f"Page OCR: {len(words)} words")
+
+        return words
+
+    def words_for(self, transform, crop_shape):
+        return slice_words(self.index, transform, crop_shape)
@@ -0,0 +1,85 @@
+import os
+import time
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# Time allowed per document / per table in seconds (0 = unlimited)
+DOCUMENT_BUDGET_SEC = float(os.environ.get("DOCUSTRUCT_DOCUMENT_BUDGET_SEC", "0"))
+TABLE_BUDGET_SEC = float(os.environ.get("DOCUSTRUCT_TABLE_BUDGET_SEC", "0"))
+
+# Share of a budget after which cheaper options are used
+DEGRADE_AT = float(os.environ.get("DOCUSTRUCT_BUDGET_DEGRADE_AT", "0.5"))
+
+# Table width OCR runs at once a budget is tight (normally 2000)
+LOW_RES_OCR_WIDTH = int(os.environ.get("DOCUSTRUCT_LOW_RES_OCR_WIDTH", "1000"))
+
+
+# Degradations, cheapest to apply first
+SKIP_PP_STRUCTURE = "skip_pp_structure"
+LOW_RES_OCR = "low_res_ocr"
+MAIN_TABLE_ONLY = "main_table_only"
+
+
+class LatencyBudget:
+    """
+    Wall-clock budget with an absolute deadline.
+
+    Only plain numbers are stored, so a budget can be handed to page
+    worker processes as-is. A table budget created with child() is
+    tight as soon as either it or its document budget is.
+    """
+
+    def __init__(self, total_sec=0, degrade_at=DEGRADE_AT, start=None, parent=None):
+        self.total_sec = total_sec
+        self.degrade_at = degrade_at
+        self.start = time.time() if start is None else start
+        self.parent = parent
+
+    @classmethod
+    def for_document(cls):
+        return cls(DOCUMENT_BUDGET_SEC)
+
+    def child(self, total_sec=TABLE_BUDGET_SEC):
+        return LatencyBudget(total_sec, self.degrade_at, parent=self)
+
+    @property
+    def limited(self):
+        return self.total_sec > 0 or (self.parent is not None and self.parent.limited)
+
+    def elapsed(self):
+        return time.time() - self.start
+
+    def used_fraction(self):
+        if self.total_sec <= 0:
+            return 0.0
+        return self.elapsed() / self.total_sec
+
+    def is_tight(self):
+        """
+        True once the degrade threshold of this or the parent budget is passed.
+        """
+        if self.parent is not None and self.parent.is_tight():
+            return True
+
+        return self.total_sec > 0 and self.used_fraction() >= self.degrade_at
+
+    def is_exhausted(self):
+        if self.parent is not None and self.parent.is_exhausted():
+            return True
+
+        return self.total_sec > 0 and self.elapsed() >= self.total_sec
+
+    def describe(self):
+        return {
+            "budget_sec": self.total_sec,
+            "elapsed_sec": round(self.elapsed(), 2),
+            "exhausted": self.is_exhausted()
+        }
+
+
+def add_degradation(degradations, name):
+    if name not in degradations:
+        degradations.append(name)
@@ -1,20 +1,424 @@
 
-from structure.table_structure_extractor import TableStructureExtractor
+from structure.table_structure_extractor import (
+    TableStructureExtractor, PP_WORDS_MIN_COVERAGE, text_coverage
+)
 from structure.html_table_parser import html_to_table
 
-from ocr.ocr_engine import run_ocr
+from ocr.ocr_engine import run_ocr, run_ocr_batch
 from preprocessing.image_cleaner import preprocess_for_ocr
+from pipeline.stages import Stage, run_stages
+from pipeline import table_router
+from pipeline import speculative
+from pipeline.budget import (
+    LOW_RES_OCR, LOW_RES_OCR_WIDTH, SKIP_PP_STRUCTURE, add_degradation
+)
+
+
+# STATE HELPERS (stage lists share one dict per table)
+def _first(result):
+    return result[0]
+
+
+def _all_words(ocr_results):
+    return [w for words, _ in ocr_results for w in words]
+
+
+def _pp_wanted(state):
+    return state["allow_pp"] and table_router.should_try_pp_structure(state.get("routing"))
+
+
+def _pp_result(state):
+    return state["pp"][0] if "pp" in state else None
+
+
+def _pp_words(state):
+    return state["pp"][1] if "pp" in state else []
 
 
 class HybridTableExtractor:
 
-    def __init__(self):
+    def __init__(self, use_angle_cls=None):
         self.pp = TableStructureExtractor()
 
-    def extract(self, table_img):
+        # page decision for the OCR direction classifier in adaptive
+        # mode (see ocr_engine.page_needs_angle_cls)
+        self.use_angle_cls = use_angle_cls
+
+        # counters of the tables this extractor saw (one extractor per
+        # page); returned with the page result, summed per document
+        self.router_stats = table_router.new_router_stats()
+        self.speculative_stats = speculative.new_speculative_stats()
+
+        # STAGES
+        self.route_stage = Stage("route", self._route_table)
+        self.pp_structure_stage = Stage("pp_structure", self.extract_pp_structure, sized=_first)
+        self.pp_attempt_stage = Stage("pp_structure", self._try_pp_structure, sized=_first)
+        self.ocr_stage = Stage("ocr", self._ocr_table, sized=_first)
+        self.ocr_batch_stage = Stage("ocr", self._ocr_many, sized=_all_words)
+        self.structure_stage = Stage("structure", self._build_from_words)
+
+        ocr_inputs = ("table_img", "ocr_words", "budget", "degradations")
+
+        # route the crop and try PPStructure (in table-recognition-only
+        # mode PPStructure reads our OCR words, so OCR runs first)
+        self.pp_stages = (
+            self.route_stage.bind(
+                ("table_img",), "routing",
+                when=lambda state: state["allow_pp"] and table_router.ROUTER_MODE != "off"
+            ),
+            self.ocr_stage.bind(
+                ocr_inputs, "ocr",
+                when=lambda state: self.pp.table_only and "ocr" not in state and _pp_wanted(state)
+            ),
+            self.pp_attempt_stage.bind(("table_img", "routing", "ocr"), "pp", when=_pp_wanted)
+        )
+
+        # custom engine, when PPStructure did not run or failed
+        self.fallback_stages = (
+            self.ocr_stage.bind(ocr_inputs, "ocr", when=self._needs_ocr),
+            self.structure_stage.bind(
+                (self._fallback_words,), "result",
+                when=lambda state: _pp_result(state) is None
+            )
+        )
+
+        # the whole single-table flow, in order
+        self.stages = self.pp_stages + self.fallback_stages
+
+    def extract(self, table_img, ocr_words=None, budget=None):
+        """
+        Args:
+            table_img: cropped table image
+            ocr_words: optional callable returning this table's words
+                (e.g. sliced from a page-level OCR pass); only called
+                when the custom engine is needed
+            budget: optional LatencyBudget; once it is tight PPStructure
+                is skipped and OCR runs at a lower resolution. Applied
+                degradations are listed in result["degradations"]
+
+        Runs self.stages. In table-recognition-only mode PPStructure
+        reads our OCR words, so OCR runs first and the words are reused
+        by the fallback. Otherwise the fallback reuses the text
+        PPStructure recognized, and only runs OCR itself when there is none.
+        """
+        degradations = []
+
+        allow_pp = self._allow_pp_structure(budget, degradations)
+
+        if speculative.SPECULATIVE_MODE and not self.pp.table_only and allow_pp:
+            return self._with_degradations(
+                self.extract_speculative(table_img, ocr_words, budget, degradations),
+                degradations
+            )
+
+        state = run_stages(
+            self.stages,
+            self._table_state(table_img, ocr_words, budget, degradations, allow_pp)
+        )
+
+        return self._finish(state)
+
+    def extract_many(self, table_imgs, word_sources=None, budget=None):
+        """
+        Extract several tables, sharing one OCR recognition batch
+        between every table that falls back to the custom engine.
+
+        Args:
+            word_sources: optional list of callables (see extract()),
+                tables with a source skip the OCR batch
+            budget: optional LatencyBudget shared by the whole batch
+
+        Returns:
+            One result per input image, in input order
+        """
+        if word_sources is None:
+            word_sources = [None] * len(table_imgs)
+
+        degradations = []
+
+        allow_pp = self._allow_pp_structure(budget, degradations)
+
+        states = [
+            self._table_state(img, word_sources[i], budget, degradations, allow_pp)
+            for i, img in enumerate(table_imgs)
+        ]
+
+        if self.pp.table_only:
+            # every table needs words before PPStructure runs
+            ocr_results = self.ocr_batch_stage(
+                table_imgs, word_sources,
+                self._use_low_res_ocr(budget, degradations)
+            )
+            for state, ocr_result in zip(states, ocr_results):
+                state["ocr"] = ocr_result
+
+        for state in states:
+            run_stages(self.pp_stages, state)
+
+        # text PPStructure already recognized needs no second OCR pass
+        pending = [i for i, state in enumerate(states) if self._needs_ocr(state)]
+
+        if pending:
+            print(f"-> Fallback to Structured logic ({len(pending)} tables, batched OCR)")
+            ocr_results = self.ocr_batch_stage(
+                [table_imgs[i] for i in pending],
+                [word_sources[i] for i in pending],
+                self._use_low_res_ocr(budget, degradations)
+            )
+            for i, ocr_result in zip(pending, ocr_results):
+                states[i]["ocr"] = ocr_result
+
+        for state in states:
+            run_stages(self.fallback_stages, state)
+
+        return [self._finish(state) for state in states]
+
+    @staticmethod
+    def _table_state(table_img, ocr_words, budget, degradations, allow_pp):
+        return {
+            "table_img": table_img,
+            "ocr_words": ocr_words,
+            "budget": budget,
+            "degradations": degradations,
+            "allow_pp": allow_pp
+        }
+
+    def _finish(self, state):
+        result = state["result"] if "result" in state else _pp_result(state)
+
+        return self._with_degradations(
+            self._with_routing(result, state.get("routing")),
+            state["degradations"]
+        )
+
+    # OCR
+    def _ocr_table(self, table_img, ocr_words=None, budget=None, degradations=None):
+        """
+        OCR words of one table (the "ocr" stage).
+
+        Returns:
+            (words, scale) where word coordinates * scale gives
+            coordinates in table_img (preprocess_for_ocr may downscale)
+        """
+        low_res = self._use_low_res_ocr(budget, degradations, ocr_words)
+
+        return self._ocr_words(table_img, ocr_words, low_res)
+
+    def _ocr_words(self, table_img, ocr_words=None, low_res=False):
+        """
+        Args:
+            low_res: OCR at LOW_RES_OCR_WIDTH instead of the usual width
+        """
+        if ocr_words is not None:
+            return ocr_words(), 1.0
+
+        ocr_ready = self._preprocess(table_img, low_res)
+        words = run_ocr(ocr_ready, self.use_angle_cls)
+
+        return words, table_img.shape[1] / ocr_ready.shape[1]
+
+    def _ocr_many(self, table_imgs, word_sources, low_res=False):
+        """
+        OCR words of several tables (the batched "ocr" stage); tables
+        without a word source share one recognition batch.
+
+        Returns:
+            One (words, scale) per table, in input order
+        """
+        ocr_results = [None] * len(table_imgs)
+
+        batched = []
+
+        for i in range(len(table_imgs)):
+            if word_sources[i] is not None:
+                ocr_results[i] = self._ocr_words(table_imgs[i], word_sources[i], low_res)
+            else:
+                batched.append(i)
+
+        if batched:
+            ocr_ready = [self._preprocess(table_imgs[i], low_res) for i in batched]
+            words_per_table = run_ocr_batch(ocr_ready, self.use_angle_cls)
+
+            for i, ready, words in zip(batched, ocr_ready, words_per_table):
+                ocr_results[i] = (words, table_imgs[i].shape[1] / ready.shape[1])
+
+        return ocr_results
+
+    def _needs_ocr(self, state):
+        """
+        The fallback OCR pass is needed unless PPStructure succeeded,
+        words are already there or PPStructure's own words can be reused.
+        """
+        if _pp_result(state) is not None or "ocr" in state:
+            return False
+
+        return not self._reusable(state["table_img"], _pp_words(state))
+
+    @staticmethod
+    def _fallback_words(state):
+
+        print("-> Fallback to Structured logic")
+
+        if "ocr" in state:
+            return state["ocr"][0]
+
+        pp_words = _pp_words(state)
+        print(f"-> Reusing PP-Structure OCR ({len(pp_words)} words)")
+
+        return pp_words
+
+    @staticmethod
+    def _reusable(table_img, pp_words):
+        """
+        PPStructure's words replace an OCR pass only when they span
+        most of the crop's text, not just one small region of it.
+        """
+        if not pp_words:
+            return False
+
+        coverage = text_coverage(pp_words, table_img)
+
+        if coverage < PP_WORDS_MIN_COVERAGE:
+            print(f"-> PP-Structure OCR covers {coverage:.0%} of the table, running OCR")
+            return False
+
+        return True
+
+    @staticmethod
+    def _preprocess(table_img, low_res):
+        if low_res:
+            return preprocess_for_ocr(table_img, LOW_RES_OCR_WIDTH)
+        return preprocess_for_ocr(table_img)
+
+    # LATENCY BUDGET
+    @staticmethod
+    def _allow_pp_structure(budget, degradations):
+        """
+        PPStructure is the most expensive engine, so it is the first
+        thing dropped once the budget is tight.
+        """
+        if budget is None or not budget.is_tight():
+            return True
+
+        print("-> Latency budget: skipping PP-Structure")
+        add_degradation(degradations, SKIP_PP_STRUCTURE)
+
+        return False
+
+    @staticmethod
+    def _use_low_res_ocr(budget, degradations, ocr_words=None):
+        """
+        Checked when OCR is about to run, so time PPStructure spent
+        counts. Words from a page-level OCR pass are already computed.
+        """
+        if ocr_words is not None or budget is None or not budget.is_tight():
+            return False
+
+        print(f"-> Latency budget: OCR at {LOW_RES_OCR_WIDTH}px width")
+        add_degradation(degradations, LOW_RES_OCR)
+
+        return True
+
+    @staticmethod
+    def _with_degradations(result, degradations):
+        if degradations and isinstance(result, dict):
+            result["degradations"] = list(degradations)
+        return result
+
+    # SPECULATIVE EXECUTION
+    def extract_speculative(self, table_img, ocr_words=None, budget=None, degradations=None):
+        """
+        Start PPStructure and the custom engine together and keep the
+        first acceptable result (see speculative.is_acceptable), so a
+        failing PPStructure attempt no longer delays the fallback.
+        Tables the router sends straight to OCR do not race.
+        """
+        routing = None
+
+        if table_router.ROUTER_MODE != "off":
+            routing = self.route_stage(table_img)
+
+        if degradations is None:
+            degradations = []
+
+        def custom():
+            words, _ = self.ocr_stage(table_img, ocr_words, budget, degradations)
+            return self.structure_stage(words)
+
+        if not table_router.should_try_pp_structure(routing):
+            return self._with_routing(custom(), routing)
+
+        result, winner, finished = speculative.race(
+            {
+                speculative.PP_STRUCTURE: lambda: self.pp_structure_stage(table_img)[0],
+                speculative.CUSTOM: custom
+            },
+            preference=(speculative.PP_STRUCTURE, speculative.CUSTOM),
+            stats=self.speculative_stats
+        )
+
+        pp_done = speculative.PP_STRUCTURE in finished
+
+        table_router.record_outcome(
+            routing, pp_done, bool(finished.get(speculative.PP_STRUCTURE)),
+            self.router_stats
+        )
+
+        if isinstance(result, dict):
+            result["speculative_winner"] = winner
+
+        return self._with_routing(result, routing)
+
+    # ROUTING
+    def _route_table(self, table_img):
+        """
+        Routing decision for a crop (the "route" stage). Tables the
+        router keeps away from PPStructure are recorded as unverified.
+        """
+        routing = table_router.route_table(table_img, self.router_stats)
+
+        if not table_router.should_try_pp_structure(routing):
+            print(f"-> Router: {routing['table_type']} table, skipping PP-Structure")
+            table_router.record_outcome(routing, False, False, self.router_stats)
+
+        return routing
+
+    def _try_pp_structure(self, table_img, routing=None, ocr_result=None):
+        """
+        PPStructure attempt of the stage list, recording whether the
+        routing decision was a hit.
+        """
+        result, pp_words = self.extract_pp_structure(table_img, ocr_result)
+
+        table_router.record_outcome(routing, True, bool(result), self.router_stats)
+
+        return result, pp_words
+
+    @staticmethod
+    def _with_routing(result, routing):
+        if routing is not None and isinstance(result, dict):
+            result["routing"] = routing
+        return result
+
+    # PP-STRUCTURE ENGINE
+    def extract_pp_structure(self, table_img, ocr_result=None):
+        """
+        Args:
+            ocr_result: optional (words, scale) handed to PPStructure's
+                table recognizer instead of its own OCR
+
+        Returns:
+            (result or None, words PPStructure recognized)
+        """
 
         # TRY PP-STRUCTURE
-        tables_html = self.pp.extract_tables(table_img)
+        if ocr_result is not None:
+            words, scale = ocr_result
+            tables_html, pp_words = self.pp.extract_tables_with_words(
+                table_img, words=words, word_scale=scale
+            )
+        else:
+            tables_html, pp_words = self.pp.extract_tables_with_words(table_img)
 
         if tables_html:
             try:
@@ -36,16 +440,14 @@ class HybridTableExtractor:
                         "columns": columns,
                         "logical_rows": logical_rows,
                         "engine": "pp_structure" 
-                    }
+                    }, pp_words
             except Exception:
                 pass
 
+        return None, pp_words
 
-        print("-> Fallback to Structured logic")
-
-        # OCR
-        ocr_ready = preprocess_for_ocr(table_img)
-        words = run_ocr(ocr_ready)
+    # CUSTOM ENGINE (OCR WORDS -> TABLE)
+    def _build_from_words(self, words):
 
         if not words:
             return []
@@ -143,13 +545,13 @@ class HybridTableExtractor:
             if any(c.strip() for c in cells):
                 table.append(cells)
 
-            return {
-                "table": table,
-                "words": words,
-                "columns": columns,
-                "logical_rows": rows,
-                "engine": "custom"  
-            }
+        return {
+            "table": table,
+            "words": words,
+            "columns": columns,
+            "logical_rows": rows,
+            "engine": "custom"  
+        }
 
 
     # ESTIMATE COLUMN COUNT BASED ON MEDIAN WORD COUNT PER ROW
@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from pipeline.stages import current_recorder, recording
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# Start PPStructure and the custom engine at the same time per table
+SPECULATIVE_MODE = os.environ.get("DOCUSTRUCT_SPECULATIVE", "0") == "1"
+
+# Threads shared by all speculative runs (two per table in flight)
+SPECULATIVE_WORKERS = int(os.environ.get("DOCUSTRUCT_SPECULATIVE_WORKERS", "4"))
+
+
+PP_STRUCTURE = "pp_structure"
+CUSTOM = "custom"
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(2, SPECULATIVE_WORKERS),
+                thread_name_prefix="docustruct-speculative"
+            )
+        return _executor
+
+
+# ---------------------------------------------------
+# WIN COUNTERS
+# ---------------------------------------------------
+# Counted per page (each page has its own extractor) and summed by the
+# document, so pages run in worker processes are not lost.
+_stats_lock = threading.Lock()
+
+
+def new_speculative_stats():
+    return {
+        "tables": 0,
+        "pp_structure_wins": 0,
+        "custom_wins": 0,
+        "no_acceptable_result": 0,
+        "losers_still_running": 0
+    }
+
+
+def _count(stats, key, n=1):
+    if stats is None:
+        return
+    with _stats_lock:
+        stats[key] += n
+
+
+def add_speculative_stats(total, stats):
+    for key, n in stats.items():
+        total[key] = total.get(key, 0) + n
+    return total
+
+
+def summarize_speculative_stats(stats):
+    stats = dict(stats)
+
+    tables = stats["tables"]
+
+    for engine in (PP_STRUCTURE, CUSTOM):
+        stats[f"{engine}_win_rate"] = (
+            round(stats[f"{engine}_wins"] / tables, 4) if tables else None
+        )
+
+    return stats
+
+
+# ---------------------------------------------------
+# QUALITY RULE
+# ---------------------------------------------------
+def is_acceptable(result):
+    """
+    Good enough to stop waiting for the other engine: more than one
+    row, more than one column and the same column count on every row.
+    """
+    if not isinstance(result, dict):
+        return False
+
+    table = result.get("table") or []
+
+    if len(table) < 2:
+        return False
+
+    widths = {len(row) for row in table}
+
+    return len(widths) == 1 and widths.pop() > 1
+
+
+# ---------------------------------------------------
+# RACE
+# ---------------------------------------------------
+def _run_quietly(fn, recorder):
+    # stage timings of the engine still go to the page's recorder
+    with recording(recorder):
+        try:
+            return fn()
+        except Exception as e:
+            print(f"-> Speculative engine failed: {e}")
+            return None
+
+
+def race(engines, preference, stats=None):
+    """
+    Run engines concurrently and return the first acceptable result.
+
+    The losing engine cannot be interrupted mid-inference; it finishes
+    in the background and its result is ignored.
+
+    Args:
+        engines: {name: callable returning a result}
+        preference: engine order used when no result is acceptable
+            (the first non-empty result in that order is returned)
+        stats: optional new_speculative_stats() dict to count into
+
+    Returns:
+        (result, winner name or None, {name: result} of finished engines)
+    """
+    recorder = current_recorder()
+
+    executor = get_executor()
+
+    start = time.perf_counter()
+
+    futures = {
+        executor.submit(_run_quietly, fn, recorder): name
+        for name, fn in engines.items()
+    }
+
+    finished = {}
+    pending = set(futures)
+
+    _count(stats, "tables")
+
+    while pending:
+
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+        for future in done:
+
+            name = futures[future]
+            finished[name] = future.result()
+
+            if is_acceptable(finished[name]):
+
+                for other in pending:
+                    # drops engines that never started, the rest run on
+                    if not other.cancel():
+                        _count(stats, "losers_still_running")
+
+                _count(stats, f"{name}_wins")
+
+                print(f"-> Speculative winner: {name} ({time.perf_counter() - start:.2f} sec)")
+
+                return finished[name], name, finished
+
+    _count(stats, "no_acceptable_result")
+
+    for name in preference:
+        if finished.get(name):
+            return finished[name], None, finished
+
+    return None, None, finished
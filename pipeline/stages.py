@@ -0,0 +1,262 @@
+"""
+Named pipeline stages and their timing.
+
+Every step of the pipeline is a Stage: a function with a fixed name,
+timed on every call (wall time, CPU time, input / output size). The
+per-table flow is a list of stages run in order by run_stages() on a
+shared state dict (HybridTableExtractor.stages, then RESULT_STAGES in
+app_entry); page- and document-level stages (layout, orientation,
+crop_deskew, export) are called directly.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# Stage names, in execution order (used to order summaries)
+STAGES = (
+    "load",
+    "layout",
+    "orientation",
+    "crop_deskew",
+    "route",
+    "pp_structure",
+    "ocr",
+    "structure",
+    "clean",
+    "metrics",
+    "export"
+)
+
+
+# Recorder of the current thread (see recording())
+_current = threading.local()
+
+
+def size_of(value):
+    """
+    Size of a stage input / output: images in bytes, everything
+    else in items (tables, words, rows, HTML strings).
+    """
+    if value is None:
+        return 0
+
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+
+    if isinstance(value, dict):
+        return len(value["table"] or []) if "table" in value else len(value)
+
+    if hasattr(value, "tables"):
+        return len(value.tables)
+
+    if isinstance(value, (list, tuple)):
+        return sum(size_of(v) for v in value) if value and isinstance(value[0], np.ndarray) else len(value)
+
+    if isinstance(value, str):
+        return len(value)
+
+    return 1
+
+
+class StageRecord:
+
+    def __init__(self, name, data=None):
+        self.name = name
+        self.input_size = size_of(data)
+        self.output = None
+
+
+class StageRecorder:
+    """
+    Collects wall time, CPU time and input/output sizes per stage.
+
+    CPU time is process-wide, so it includes the math-library threads a
+    stage starts (and, with concurrent tables, its neighbours' work).
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, wall, cpu, input_size, output_size, calls=1):
+
+        with self._lock:
+
+            stats = self._stats.setdefault(name, {
+                "calls": 0,
+                "wall_sec": 0.0,
+                "cpu_sec": 0.0,
+                "input_size": 0,
+                "output_size": 0
+            })
+
+            stats["calls"] += calls
+            stats["wall_sec"] += wall
+            stats["cpu_sec"] += cpu
+            stats["input_size"] += input_size
+            stats["output_size"] += output_size
+
+    def merge(self, summary):
+        """
+        Add a summary() from elsewhere, e.g. a page worker process.
+        """
+        for name, stats in summary.items():
+            self.add(
+                name,
+                stats["wall_sec"],
+                stats["cpu_sec"],
+                stats["input_size"],
+                stats["output_size"],
+                stats["calls"]
+            )
+
+    def summary(self):
+        """
+        {stage: {calls, wall_sec, cpu_sec, input_size, output_size}}
+        in pipeline order.
+        """
+        with self._lock:
+            names = sorted(
+                self._stats,
+                key=lambda n: STAGES.index(n) if n in STAGES else len(STAGES)
+            )
+
+            return {
+                name: {
+                    **self._stats[name],
+                    "wall_sec": round(self._stats[name]["wall_sec"], 4),
+                    "cpu_sec": round(self._stats[name]["cpu_sec"], 4)
+                }
+                for name in names
+            }
+
+
+@contextmanager
+def recording(recorder):
+    """
+    Send this thread's stage timings to `recorder`.
+    """
+    previous = getattr(_current, "recorder", None)
+    _current.recorder = recorder
+    try:
+        yield recorder
+    finally:
+        _current.recorder = previous
+
+
+def current_recorder():
+    return getattr(_current, "recorder", None)
+
+
+@contextmanager
+def stage(name, data=None):
+    """
+    Time one stage run. Set `.output` on the yielded record so the
+    output size is recorded too. A no-op without a recorder.
+    """
+    record = StageRecord(name, data)
+
+    recorder = current_recorder()
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    try:
+        yield record
+    finally:
+        if recorder is not None:
+            recorder.add(
+                name,
+                time.perf_counter() - wall_start,
+                time.process_time() - cpu_start,
+                record.input_size,
+                size_of(record.output)
+            )
+
+
+class Stage:
+    """
+    A function timed under a stage name: calling it runs `fn` inside
+    stage(). The first positional argument is taken as the stage input.
+
+    In a stage list (see run_stages) a stage reads its arguments from
+    the run state, stores its result there and is skipped when its
+    condition does not hold; bind() sets these up.
+
+    Args:
+        sized: optional function picking the part of the result whose
+            size is recorded (e.g. the words of a (words, scale) pair)
+    """
+
+    def __init__(self, name, fn, inputs=(), output=None, when=None, sized=None):
+        self.name = name
+        self.fn = fn
+
+        # state keys (or callables of the state) passed as arguments
+        self.inputs = inputs
+
+        # state key the result is stored under
+        self.output = output
+
+        self.when = when
+        self.sized = sized
+
+    def __call__(self, *args, **kwargs):
+
+        with stage(self.name, args[0] if args else None) as record:
+            result = self.fn(*args, **kwargs)
+            record.output = result if self.sized is None else self.sized(result)
+
+        return result
+
+    def bind(self, inputs=(), output=None, when=None):
+        """
+        This stage as an entry of a stage list.
+        """
+        return Stage(self.name, self.fn, inputs, output, when, self.sized)
+
+    def applies(self, state):
+        return self.when is None or bool(self.when(state))
+
+    def run(self, state):
+
+        args = [key(state) if callable(key) else state.get(key) for key in self.inputs]
+
+        result = self(*args)
+
+        if self.output is not None:
+            state[self.output] = result
+
+        return result
+
+
+def run_stages(stages, state):
+    """
+    Run a stage list in order on `state` (a dict), skipping stages
+    whose condition does not hold. Returns the state.
+    """
+    for entry in stages:
+        if entry.applies(state):
+            entry.run(state)
+
+    return state
+
+
+def format_summary(summary):
+    """
+    Log lines for a summary(), one per stage.
+    """
+    lines = []
+
+    for name, stats in summary.items():
+        lines.append(
+            f"{name}: {stats['calls']} calls, "
+            f"wall {stats['wall_sec']:.3f} sec, cpu {stats['cpu_sec']:.3f} sec, "
+            f"in {stats['input_size']}, out {stats['output_size']}"
+        )
+
+    return lines
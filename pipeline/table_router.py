@@ -0,0 +1,157 @@
+import os
+import threading
+
+from structure.line_detector import detect_table_lines
+from structure.line_detector import classify_table_type as classify_by_line_counts
+from structure.table_classifier import classify_table_type as classify_grid_or_text
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# "off"   : PPStructure first on every table (original behaviour)
+# "on"    : skip PPStructure on tables it is unlikely to win
+# "audit" : still run PPStructure everywhere, only measure the router
+ROUTER_MODE = os.environ.get("DOCUSTRUCT_TABLE_ROUTER", "off").lower()
+
+# Table types sent to PPStructure first; the rest go straight to OCR
+PP_STRUCTURE_TYPES = tuple(
+    t.strip() for t in
+    os.environ.get("DOCUSTRUCT_ROUTER_PP_TYPES", "grid,row_lines").split(",")
+    if t.strip()
+)
+
+PP_STRUCTURE = "pp_structure"
+CUSTOM = "custom"
+
+
+# ---------------------------------------------------
+# ROUTER COUNTERS
+# ---------------------------------------------------
+# Counted per page (each page has its own extractor) and summed by the
+# document, so pages run in worker processes are not lost.
+_router_lock = threading.Lock()
+
+
+def new_router_stats():
+    return {
+        "tables": 0,
+        "routed_pp_structure": 0,
+        "routed_custom": 0,
+        "hits": 0,
+        "misses": 0,
+        "unverified": 0,
+        "table_types": {}
+    }
+
+
+def _count(stats, key, n=1):
+    if stats is None:
+        return
+    with _router_lock:
+        stats[key] += n
+
+
+def add_router_stats(total, stats):
+    for key, n in stats.items():
+        if key == "table_types":
+            types = total.setdefault(key, {})
+            for table_type, count in n.items():
+                types[table_type] = types.get(table_type, 0) + count
+        else:
+            total[key] = total.get(key, 0) + n
+    return total
+
+
+def summarize_router_stats(stats):
+    stats = dict(stats)
+
+    verified = stats["hits"] + stats["misses"]
+
+    stats["mode"] = ROUTER_MODE
+    stats["hit_rate"] = round(stats["hits"] / verified, 4) if verified else None
+
+    return stats
+
+
+# ---------------------------------------------------
+# ROUTING
+# ---------------------------------------------------
+def classify_table(table_img):
+    """
+    grid / row_lines / no_lines from the ruling lines of a table crop.
+
+    line_detector needs more than 5 horizontal rules to call a table
+    ruled, which misses short ruled tables; table_classifier's looser
+    grid test (2+ rules each way) catches those.
+    """
+    line_info = detect_table_lines(table_img)
+
+    table_type = classify_by_line_counts(line_info["horizontal"], line_info["vertical"])
+
+    if table_type == "no_lines" and classify_grid_or_text(line_info) == "grid":
+        table_type = "grid"
+
+    return table_type, line_info
+
+
+def route_table(table_img, stats=None):
+    """
+    Decide which engine a table crop should start with.
+
+    Args:
+        stats: optional new_router_stats() dict to count into
+
+    Returns:
+        {table_type, route, horizontal_lines, vertical_lines}
+    """
+    table_type, line_info = classify_table(table_img)
+
+    route = PP_STRUCTURE if table_type in PP_STRUCTURE_TYPES else CUSTOM
+
+    if stats is not None:
+        with _router_lock:
+            stats["tables"] += 1
+            stats[f"routed_{route}"] += 1
+            stats["table_types"][table_type] = stats["table_types"].get(table_type, 0) + 1
+
+    return {
+        "table_type": table_type,
+        "route": route,
+        "horizontal_lines": len(line_info["horizontal"]),
+        "vertical_lines": len(line_info["vertical"])
+    }
+
+
+def should_try_pp_structure(decision):
+    """
+    Whether PPStructure runs for this table (always, unless routing is on).
+    """
+    if decision is None or ROUTER_MODE != "on":
+        return True
+
+    return decision["route"] == PP_STRUCTURE
+
+
+def record_outcome(decision, pp_ran, pp_won, stats=None):
+    """
+    A decision is a hit when the chosen engine is the one that wins:
+    PPStructure routes need PPStructure to succeed, custom routes need
+    it to fail. Custom routes can only be verified in audit mode,
+    where PPStructure still runs.
+    """
+    if decision is None:
+        return
+
+    if not pp_ran:
+        _count(stats, "unverified")
+        decision["verified"] = False
+        return
+
+    hit = pp_won == (decision["route"] == PP_STRUCTURE)
+
+    _count(stats, "hits" if hit else "misses")
+
+    decision["verified"] = True
+    decision["hit"] = hit
@@ -1,22 +1,25 @@
 import cv2
 import numpy as np
-from pdf2image import convert_from_path
+
+from preprocessing.page_source import PageSource
+
 
 def load_image(file_path):
     """
     Loads invoice from image or PDF and returns OpenCV image.
+    Only the first page of a PDF / TIFF is rendered.
     """
-    if file_path.lower().endswith(".pdf"):
-        pages = convert_from_path(file_path, dpi=300)
-        image = np.array(pages[0])   # take first page
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-    else:
-        image = cv2.imread(file_path)
+    return PageSource(file_path, dpi=300).page(0)
 
-    if image is None:
-        raise Exception("Invalid file or corrupted image")
 
-    return image
+def load_pages(file_path, dpi=300):
+    """
+    Lazily loads every page of a PDF / multi-page TIFF (or a single image).
+
+    Returns a PageSource: iterate it to render pages one at a time,
+    or call list() on it to materialize all pages.
+    """
+    return PageSource(file_path, dpi=dpi)
 
 
 def resize_image(image, max_width=2000):
@@ -61,7 +64,7 @@ def preprocess_image(image):
     return enhanced
 
 
-def preprocess_for_ocr(image):
+def preprocess_for_ocr(image, max_width=2000):
     """
     Preprocessing pipeline specifically for PaddleOCR.
 
@@ -69,26 +72,30 @@ def preprocess_for_ocr(image):
     So we avoid aggressive binarization and morphology.
 
     Steps:
+    - Grayscale
     - Resize
     - Light denoise
-    - Grayscale
     - Contrast normalization
-    """
 
-    # Resize for consistency
-    image = resize_image(image)
+    The input (often a view into the page) is only read. Working in
+    one channel before resizing keeps a single gray buffer alive, which
+    blur and normalization then overwrite in place.
+    """
 
     # Convert to grayscale
     if len(image.shape) == 3:
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     else:
-        gray = image.copy()
+        gray = image
+
+    # Resize for consistency (smaller max_width = faster, coarser OCR)
+    gray = resize_image(gray, max_width)
 
-    # Light noise removal (not aggressive)
-    gray = cv2.GaussianBlur(gray, (3, 3), 0)
+    # Light noise removal (not aggressive); in place unless gray is the caller's image
+    gray = cv2.GaussianBlur(gray, (3, 3), 0, dst=None if gray is image else gray)
 
     # Contrast normalization (keeps texture)
-    gray = cv2.normalize(gray, None, alpha=0, beta=255, norm_type=cv2.NORM_MINMAX)
+    cv2.normalize(gray, gray, alpha=0, beta=255, norm_type=cv2.NORM_MINMAX)
 
     # Convert back to BGR (PaddleOCR prefers BGR/RGB)
     ocr_ready = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
@@ -0,0 +1,127 @@
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+
+PDF_EXTENSIONS = (".pdf",)
+TIFF_EXTENSIONS = (".tif", ".tiff")
+
+
+class PageSource:
+    """
+    Lazy, page-at-a-time view of a document.
+
+    PDFs are rendered one page per call (pdf2image first_page/last_page)
+    and multi-page TIFFs are decoded one frame at a time, so peak memory
+    is bounded by the pages currently in use, not the document size.
+
+    Iterating yields OpenCV (BGR) images in page order.
+    """
+
+    def __init__(self, file_path, dpi=300):
+        self.file_path = file_path
+        self.dpi = dpi
+
+        ext = os.path.splitext(file_path)[1].lower()
+
+        if ext in PDF_EXTENSIONS:
+            self.kind = "pdf"
+        elif ext in TIFF_EXTENSIONS:
+            self.kind = "tiff"
+        else:
+            self.kind = "image"
+
+        self._page_count = None
+
+        # temp copy made by from_bytes(), deleted by close()
+        self._owns_file = False
+
+    @classmethod
+    def from_bytes(cls, data, suffix, dpi=300):
+        """
+        Build a source from uploaded bytes (kept in a temp file so pages
+        can still be rendered one at a time). Call close() when done to
+        delete the temp file.
+        """
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            tmp.write(data)
+
+        source = cls(tmp.name, dpi=dpi)
+        source._owns_file = True
+
+        return source
+
+    def close(self):
+        """
+        Delete the temp file of a source built by from_bytes(); files
+        the source was opened on are left alone.
+        """
+        if self._owns_file:
+            self._owns_file = False
+            try:
+                os.remove(self.file_path)
+            except FileNotFoundError:
+                pass
+
+    # ---------------------------------------------------
+    # PAGE COUNT
+    # ---------------------------------------------------
+    def __len__(self):
+
+        if self._page_count is None:
+
+            if self.kind == "pdf":
+                from pdf2image import pdfinfo_from_path
+                self._page_count = int(pdfinfo_from_path(self.file_path)["Pages"])
+
+            elif self.kind == "tiff":
+                from PIL import Image
+                with Image.open(self.file_path) as img:
+                    self._page_count = getattr(img, "n_frames", 1)
+
+            else:
+                self._page_count = 1
+
+        return self._page_count
+
+    # ---------------------------------------------------
+    # PAGE ACCESS
+    # ---------------------------------------------------
+    def page(self, index):
+        """
+        Render a single page (0-based) as a BGR image.
+        """
+        if index < 0 or index >= len(self):
+            raise IndexError(f"Page {index + 1} out of range (1-{len(self)})")
+
+        if self.kind == "pdf":
+            from pdf2image import convert_from_path
+
+            rendered = convert_from_path(
+                self.file_path,
+                dpi=self.dpi,
+                first_page=index + 1,
+                last_page=index + 1
+            )
+            image = cv2.cvtColor(np.array(rendered[0]), cv2.COLOR_RGB2BGR)
+
+        elif self.kind == "tiff":
+            from PIL import Image
+
+            with Image.open(self.file_path) as img:
+                img.seek(index)
+                image = cv2.cvtColor(np.array(img.convert("RGB")), cv2.COLOR_RGB2BGR)
+
+        else:
+            image = cv2.imread(self.file_path)
+
+        if image is None:
+            raise Exception("Invalid file or corrupted image")
+
+        return image
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.page(index)
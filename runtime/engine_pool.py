@@ -0,0 +1,212 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from runtime.model_registry import registry
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# Max engine instances per pool (PaddleOCR / PPStructure are not thread-safe).
+# Defaults to one engine per table worker thread, at least 2.
+DEFAULT_POOL_SIZE = int(os.environ.get(
+    "DOCUSTRUCT_ENGINE_POOL_SIZE",
+    str(max(2, int(os.environ.get("DOCUSTRUCT_TABLE_WORKERS", "1"))))
+))
+
+
+class EnginePool:
+    """
+    Pool of pre-built engine instances with checkout / return semantics.
+
+    An engine is owned by exactly one thread between checkout() and
+    release(). A thread that checks out again while already holding an
+    engine gets the same instance back, so nested calls cannot deadlock
+    on a small pool.
+    """
+
+    def __init__(self, name, factory, size=DEFAULT_POOL_SIZE):
+        self.name = name
+        self.factory = factory
+        self.size = max(1, size)
+
+        # LIFO keeps the most recently used (warmest) engine in rotation
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+        self._local = threading.local()
+        self._owners = {}
+
+        self.build_times = []
+
+    # ---------------------------------------------------
+    # BUILD
+    # ---------------------------------------------------
+    def _build(self):
+        start = time.perf_counter()
+        engine = self.factory()
+        elapsed = time.perf_counter() - start
+
+        self.build_times.append(round(elapsed, 3))
+        print(f"Engine '{self.name}' #{len(self.build_times)} built in {elapsed:.2f} sec")
+
+        return engine
+
+    def _acquire(self, timeout):
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_build = self._created < self.size
+            if can_build:
+                self._created += 1
+
+        if can_build:
+            try:
+                return self._build()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        # pool exhausted, wait for another thread to return an engine
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No '{self.name}' engine became available within {timeout} sec"
+            )
+
+    def prefill(self, count=None):
+        """
+        Build engines ahead of time so the first requests get warm ones.
+        """
+        count = self.size if count is None else min(count, self.size)
+
+        while True:
+            with self._lock:
+                if self._created >= count:
+                    break
+                self._created += 1
+
+            try:
+                self._idle.put(self._build())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    def warm(self, fn):
+        """
+        Fill the pool and run `fn(engine)` once on every instance,
+        so no request is the first to touch a cold engine.
+        """
+        self.prefill()
+
+        engines = []
+        try:
+            for _ in range(self.size):
+                engines.append(self._idle.get(timeout=None))
+
+            for engine in engines:
+                fn(engine)
+        finally:
+            for engine in engines:
+                self._idle.put(engine)
+
+    # ---------------------------------------------------
+    # CHECKOUT / RETURN
+    # ---------------------------------------------------
+    def checkout(self, timeout=None):
+
+        held = getattr(self._local, "engine", None)
+
+        if held is not None:
+            self._local.depth += 1
+            return held
+
+        engine = self._acquire(timeout)
+
+        self._owners[id(engine)] = threading.get_ident()
+        self._local.engine = engine
+        self._local.depth = 1
+
+        return engine
+
+    def release(self, engine):
+
+        if self._owners.get(id(engine)) != threading.get_ident():
+            raise RuntimeError(
+                f"'{self.name}' engine released by a thread that does not own it"
+            )
+
+        self._local.depth -= 1
+
+        if self._local.depth > 0:
+            return
+
+        self._local.engine = None
+        del self._owners[id(engine)]
+
+        self._idle.put(engine)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        engine = self.checkout(timeout)
+        try:
+            yield engine
+        finally:
+            self.release(engine)
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "size": self.size,
+            "created": self._created,
+            "idle": self._idle.qsize(),
+            "in_use": len(self._owners),
+            "build_times": list(self.build_times)
+        }
+
+
+# ---------------------------------------------------
+# SHARED POOLS (one per registered model)
+# ---------------------------------------------------
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name, size=None):
+    """
+    Return the process-wide pool for a model registered in the registry.
+    """
+    pool = _pools.get(name)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+
+        if name not in _pools:
+
+            if not registry.is_registered(name):
+                raise KeyError(f"No model registered under '{name}'")
+
+            _pools[name] = EnginePool(
+                name,
+                lambda: registry.build(name),
+                size=size or DEFAULT_POOL_SIZE
+            )
+
+        return _pools[name]
+
+
+def pool_stats():
+    return [pool.stats() for pool in _pools.values()]
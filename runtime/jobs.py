@@ -0,0 +1,338 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# Worker threads draining the job queue
+JOB_WORKERS = int(os.environ.get("DOCUSTRUCT_JOB_WORKERS", "2"))
+
+# Finished jobs kept in memory before the oldest are forgotten
+MAX_FINISHED_JOBS = int(os.environ.get("DOCUSTRUCT_MAX_FINISHED_JOBS", "1000"))
+
+# Where per-job Excel files are written
+JOB_OUTPUT_DIR = os.environ.get(
+    "DOCUSTRUCT_JOB_OUTPUT_DIR",
+    os.path.join(tempfile.gettempdir(), "docustruct_jobs")
+)
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+
+    def __init__(self, job_id, document, suffix=None):
+        self.id = job_id
+        self.document = document
+        self.suffix = suffix
+
+        self.status = QUEUED
+        self.stage = QUEUED
+        self.pages_done = 0
+        self.pages_total = None
+
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        self.result = None
+        self.error = None
+        self.excel_path = None
+        self.logs = []
+
+    def to_status(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "pages_done": self.pages_done,
+            "pages_total": self.pages_total,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error
+        }
+
+
+class InMemoryJobQueue:
+    """
+    In-process queue of job ids.
+
+    Stand-in for an external broker: anything with put(job_id) and
+    get(timeout) -> job_id (raising queue.Empty) can replace it.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def put(self, job_id):
+        self._queue.put(job_id)
+
+    def get(self, timeout=None):
+        return self._queue.get(timeout=timeout)
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+def _as_pages(document, suffix):
+    """
+    Accept a file path, uploaded bytes, one image or a list of images.
+
+    Returns:
+        (pages, temp file to delete when the job ends, or None)
+    """
+    from preprocessing.page_source import PageSource
+
+    if isinstance(document, str):
+        return PageSource(document), None
+
+    if isinstance(document, (bytes, bytearray)):
+
+        if suffix in (".pdf", ".tif", ".tiff"):
+            pages = PageSource.from_bytes(bytes(document), suffix)
+            return pages, pages.file_path
+
+        import cv2
+        image = cv2.imdecode(np.frombuffer(document, dtype=np.uint8), 1)
+
+        if image is None:
+            raise ValueError("Invalid file or corrupted image")
+
+        return [image], None
+
+    if isinstance(document, np.ndarray):
+        return [document], None
+
+    return document, None
+
+
+class JobManager:
+    """
+    Asynchronous extraction jobs: submit a document, poll its status,
+    then fetch the result or the Excel file.
+
+    Worker threads drain the queue and run app_entry.run_document, so
+    callers (e.g. UI threads) never block on extraction.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, job_queue=None, output_dir=JOB_OUTPUT_DIR):
+        self.queue = job_queue or InMemoryJobQueue()
+        self.output_dir = output_dir
+
+        self._jobs = {}
+        self._finished = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        os.makedirs(output_dir, exist_ok=True)
+
+        self._threads = [
+            threading.Thread(
+                target=self._worker_loop,
+                name=f"docustruct-job-{i + 1}",
+                daemon=True
+            )
+            for i in range(max(1, workers))
+        ]
+
+        for thread in self._threads:
+            thread.start()
+
+    # ---------------------------------------------------
+    # PUBLIC API
+    # ---------------------------------------------------
+    def submit(self, document, suffix=None):
+        """
+        Queue a document for extraction.
+
+        Args:
+            document: file path, file bytes, image array or list of images
+            suffix: file extension when passing bytes (".pdf", ".png", ...)
+
+        Returns:
+            job id
+        """
+        job = Job(uuid.uuid4().hex, document, suffix and suffix.lower())
+
+        with self._lock:
+            self._jobs[job.id] = job
+
+        self.queue.put(job.id)
+
+        return job.id
+
+    def status(self, job_id):
+        return self._get(job_id).to_status()
+
+    def result(self, job_id):
+        """
+        The run_document() result of a finished job, None while running.
+        """
+        job = self._get(job_id)
+
+        if job.status == FAILED:
+            return {"error": job.error}
+
+        return job.result
+
+    def excel(self, job_id):
+        """
+        Excel bytes of a finished job, None if not available.
+        """
+        job = self._get(job_id)
+
+        if job.excel_path is None or not os.path.exists(job.excel_path):
+            return None
+
+        with open(job.excel_path, "rb") as f:
+            return f.read()
+
+    def logs(self, job_id):
+        return list(self._get(job_id).logs)
+
+    def wait(self, job_id, timeout=None, poll_interval=0.1):
+        """
+        Block until the job finishes (mainly for scripts and tests).
+        """
+        deadline = None if timeout is None else time.time() + timeout
+
+        while self._get(job_id).status in (QUEUED, RUNNING):
+
+            if deadline is not None and time.time() > deadline:
+                raise TimeoutError(f"Job {job_id} did not finish within {timeout} sec")
+
+            time.sleep(poll_interval)
+
+        return self.status(job_id)
+
+    def shutdown(self):
+        self._stop.set()
+
+        for thread in self._threads:
+            thread.join()
+
+    # ---------------------------------------------------
+    # WORKERS
+    # ---------------------------------------------------
+    def _get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+        if job is None:
+            raise KeyError(f"Unknown job: {job_id}")
+
+        return job
+
+    def _worker_loop(self):
+
+        while not self._stop.is_set():
+
+            try:
+                job_id = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                job = self._get(job_id)
+            except KeyError:
+                continue
+
+            self._run(job)
+
+    def _run(self, job):
+
+        # imported here so creating a manager does not load the pipeline
+        from app_entry import run_document, logger
+
+        job.status = RUNNING
+        job.stage = "loading"
+        job.started_at = time.time()
+
+        def progress(stage, **info):
+            job.stage = stage
+            if stage == "page_done":
+                job.pages_done = info.get("page", job.pages_done)
+
+        temp_path = None
+
+        try:
+            pages, temp_path = _as_pages(job.document, job.suffix)
+
+            try:
+                job.pages_total = len(pages)
+            except TypeError:
+                job.pages_total = None
+
+            excel_path = os.path.join(self.output_dir, f"{job.id}.xlsx")
+
+            # each job keeps its own log instead of the shared session log
+            with logger.capture() as lines:
+                result = run_document(pages, progress=progress, excel_path=excel_path)
+
+            job.logs = lines
+            job.result = result
+
+            if "error" in result:
+                job.status = FAILED
+                job.error = result["error"]
+            else:
+                job.status = DONE
+                job.excel_path = result.get("excel_path")
+
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+
+        finally:
+            job.stage = job.status
+            job.finished_at = time.time()
+
+            # the input is no longer needed once the job is finished
+            job.document = None
+
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+            self._remember_finished(job)
+
+    def _remember_finished(self, job):
+
+        with self._lock:
+
+            self._finished.append(job.id)
+
+            while len(self._finished) > MAX_FINISHED_JOBS:
+
+                old = self._jobs.pop(self._finished.pop(0), None)
+
+                if old is not None and old.excel_path and os.path.exists(old.excel_path):
+                    os.remove(old.excel_path)
+
+
+# ---------------------------------------------------
+# SHARED MANAGER
+# ---------------------------------------------------
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    global _manager
+
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
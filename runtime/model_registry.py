@@ -0,0 +1,118 @@
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of inference engines.
+
+    Each engine is registered with a loader function and is only built
+    the first time it is requested. Nothing here depends on Streamlit,
+    so the same registry serves the UI, CLI tools, workers and tests.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._load_times = {}
+
+        # seconds per instance built with build() (pooled engines)
+        self._build_times = {}
+
+        # one lock per engine so YOLO and PaddleOCR can load in parallel
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+
+    def register(self, name, loader):
+        """
+        Register a zero-argument loader under a model name.
+        Re-registering a name drops any instance already loaded.
+        """
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._models.pop(name, None)
+            self._load_times.pop(name, None)
+            self._build_times.pop(name, None)
+
+    def get(self, name):
+        """
+        Return the engine for `name`, loading it on first use.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        with self._locks[name]:
+
+            # another thread may have finished loading while we waited
+            model = self._models.get(name)
+            if model is not None:
+                return model
+
+            start = time.perf_counter()
+            model = self._loaders[name]()
+            elapsed = time.perf_counter() - start
+
+            self._models[name] = model
+            self._load_times[name] = round(elapsed, 3)
+
+            print(f"Model '{name}' loaded in {elapsed:.2f} sec")
+
+        return model
+
+    def build(self, name):
+        """
+        Construct a fresh, uncached instance of `name`.
+        Used by engine pools that need several independent copies.
+        """
+        if name not in self._loaders:
+            raise KeyError(f"No model registered under '{name}'")
+
+        start = time.perf_counter()
+        model = self._loaders[name]()
+        elapsed = time.perf_counter() - start
+
+        with self._registry_lock:
+            self._build_times.setdefault(name, []).append(round(elapsed, 3))
+
+        return model
+
+    def is_registered(self, name):
+        return name in self._loaders
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def unload(self, name):
+        with self._locks.get(name, self._registry_lock):
+            self._models.pop(name, None)
+            self._load_times.pop(name, None)
+
+    def load_times(self):
+        """
+        Seconds spent loading each engine that has been loaded so far.
+        """
+        return dict(self._load_times)
+
+    def build_times(self):
+        """
+        Seconds spent building each pooled instance, per engine.
+        """
+        with self._registry_lock:
+            return {name: list(times) for name, times in self._build_times.items()}
+
+
+# Shared instance for the whole process
+registry = ModelRegistry()
+
+
+def register_model(name, loader):
+    registry.register(name, loader)
+
+
+def get_model(name):
+    return registry.get(name)
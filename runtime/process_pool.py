@@ -0,0 +1,117 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# Worker processes used to spread pages of a document (1 = in-process)
+PAGE_WORKERS = int(os.environ.get("DOCUSTRUCT_PAGE_WORKERS", "1"))
+
+# "spawn" is the safe default: paddle / torch threads do not survive fork
+START_METHOD = os.environ.get("DOCUSTRUCT_MP_START_METHOD", "spawn")
+
+# Threads per worker for BLAS / OpenMP / OpenCV, 0 = cores / workers
+THREADS_PER_WORKER = int(os.environ.get("DOCUSTRUCT_THREADS_PER_WORKER", "0"))
+
+
+# one pool per worker count; a pool is never shut down while in use
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def threads_for(workers):
+    if THREADS_PER_WORKER > 0:
+        return THREADS_PER_WORKER
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _init_worker(threads):
+    """
+    Pin each worker to its share of the cores, so N workers do not
+    oversubscribe the machine with N x cores math threads.
+    """
+    for var in (
+        "OMP_NUM_THREADS",
+        "MKL_NUM_THREADS",
+        "OPENBLAS_NUM_THREADS",
+        "FLAGS_cpu_math_library_num_threads"
+    ):
+        os.environ[var] = str(threads)
+
+    try:
+        import cv2
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+
+
+def get_process_pool(workers=None):
+    """
+    Long-lived process pool shared by all documents.
+
+    Workers keep their lazily loaded models between documents, so only
+    the first document pays for model loading in each worker.
+
+    Callers asking for different worker counts get separate pools, so
+    one caller never shuts down a pool another thread is submitting to.
+    Each pool holds its own copy of the models, so keep the number of
+    distinct worker counts small.
+
+    A pool whose worker died (crash, OOM kill) is broken for good and
+    fails every later submit, so it is replaced on the next call.
+    """
+    workers = max(1, workers or PAGE_WORKERS)
+
+    with _executor_lock:
+
+        executor = _executors.get(workers)
+
+        if executor is not None and is_broken(executor):
+            print(f"-> Replacing broken process pool ({workers} workers)")
+            executor.shutdown(wait=False, cancel_futures=True)
+            executor = None
+
+        if executor is None:
+            _executors[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(START_METHOD),
+                initializer=_init_worker,
+                initargs=(threads_for(workers),)
+            )
+
+        return _executors[workers]
+
+
+def is_broken(executor):
+    return bool(getattr(executor, "_broken", False))
+
+
+def discard_process_pool(executor):
+    """
+    Drop `executor` after it raised BrokenProcessPool, so the next
+    get_process_pool() call starts fresh workers.
+    """
+    with _executor_lock:
+        for workers, cached in list(_executors.items()):
+            if cached is executor:
+                del _executors[workers]
+
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_process_pool():
+
+    with _executor_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+
+atexit.register(shutdown_process_pool)
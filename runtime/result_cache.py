@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# Reuse results of documents that were already extracted
+RESULT_CACHE_ENABLED = os.environ.get("DOCUSTRUCT_RESULT_CACHE", "0") == "1"
+
+# SQLite file holding the cached results
+RESULT_CACHE_PATH = os.environ.get(
+    "DOCUSTRUCT_RESULT_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "docustruct_cache", "results.sqlite")
+)
+
+# Total size of cached results + Excel files before the least
+# recently used entries are evicted
+RESULT_CACHE_MAX_MB = int(os.environ.get("DOCUSTRUCT_RESULT_CACHE_MB", "512"))
+
+
+_HASH_CHUNK = 1 << 20
+
+
+# ---------------------------------------------------
+# KEYS
+# ---------------------------------------------------
+def hash_file(path):
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def hash_image(image, digest=None):
+    """
+    Hash of the pixels, so re-decoding the same upload gives the same key.
+    """
+    digest = digest or hashlib.sha256()
+
+    image = np.ascontiguousarray(image)
+
+    digest.update(f"{image.shape}{image.dtype}".encode())
+    digest.update(memoryview(image).cast("B"))
+
+    return digest
+
+
+def hash_document(pages):
+    """
+    Content hash of a document, or None if it cannot be hashed
+    without consuming it (e.g. a generator).
+
+    PageSource documents hash the file bytes plus the rendering dpi;
+    lists of page images hash the pixels.
+    """
+    file_path = getattr(pages, "file_path", None)
+
+    if file_path is not None:
+        return f"file:{hash_file(file_path)}:{getattr(pages, 'dpi', '')}"
+
+    if isinstance(pages, (list, tuple)) and all(isinstance(p, np.ndarray) for p in pages):
+
+        digest = hashlib.sha256()
+
+        for page in pages:
+            hash_image(page, digest)
+
+        return f"pixels:{digest.hexdigest()}"
+
+    return None
+
+
+def file_version(path):
+    """
+    Cheap identity of a model file: replacing the weights changes the key.
+    """
+    try:
+        stat = os.stat(path)
+        return f"{os.path.basename(path)}:{stat.st_size}:{int(stat.st_mtime)}"
+    except OSError:
+        return f"{os.path.basename(path)}:missing"
+
+
+def package_version(name):
+    try:
+        from importlib.metadata import version
+        return version(name)
+    except Exception:
+        return None
+
+
+def make_key(content_hash, config):
+    """
+    Cache key from a document hash and the pipeline configuration
+    (model versions and every setting that changes the output).
+    """
+    config_text = json.dumps(config, sort_keys=True, default=str)
+
+    return hashlib.sha256(f"{content_hash}|{config_text}".encode()).hexdigest()
+
+
+def _to_json(value):
+    # numpy scalars and tuples inside metrics
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, tuple):
+        return list(value)
+    return str(value)
+
+
+# ---------------------------------------------------
+# STORE
+# ---------------------------------------------------
+class ResultCache:
+    """
+    Content-addressed store of document results and their Excel files.
+
+    One SQLite file; entries are evicted least recently used first once
+    their total size exceeds `max_bytes`.
+    """
+
+    def __init__(self, path=RESULT_CACHE_PATH, max_bytes=RESULT_CACHE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY,"
+                " result TEXT NOT NULL,"
+                " excel BLOB,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS results_lru ON results (last_access)"
+            )
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Returns:
+            (result dict, excel bytes) or None
+        """
+        with self._lock:
+
+            row = self._db.execute(
+                "SELECT result, excel FROM results WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+            with self._db:
+                self._db.execute(
+                    "UPDATE results SET last_access = ? WHERE key = ?",
+                    (time.time(), key)
+                )
+
+        return json.loads(row[0]), row[1]
+
+    def put(self, key, result, excel_bytes=None):
+
+        result_text = json.dumps(result, default=_to_json)
+        size = len(result_text) + len(excel_bytes or b"")
+
+        # an entry larger than the whole cache would only evict everything
+        if size > self.max_bytes:
+            return
+
+        with self._lock, self._db:
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, result, excel, size, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, result_text, excel_bytes, size, time.time())
+            )
+
+            self._evict()
+
+    def _evict(self):
+
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute(
+            "SELECT key, size FROM results ORDER BY last_access"
+        ).fetchall()
+
+        for key, size in rows:
+
+            if total <= self.max_bytes:
+                break
+
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM results")
+
+    def stats(self):
+        with self._lock:
+            count, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+
+        return {
+            "entries": count,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
@@ -0,0 +1,127 @@
+import os
+import shutil
+from collections import namedtuple
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# Hand page images to worker processes through shared memory instead
+# of pickling them (0 = pickle every page)
+SHARED_PAGES_ENABLED = os.environ.get("DOCUSTRUCT_SHARED_PAGES", "1") == "1"
+
+# POSIX shared memory lives here on Linux; writing past a full /dev/shm
+# kills the process with SIGBUS, so free space is checked first
+SHM_DIR = "/dev/shm"
+
+
+# What a worker receives instead of the page: a few bytes to pickle
+SharedPage = namedtuple("SharedPage", ["name", "shape", "dtype"])
+
+
+# Worker-side blocks whose pages are still referenced (closed later)
+_lingering = []
+
+
+def _has_room(nbytes):
+    if not os.path.isdir(SHM_DIR):
+        return True
+
+    return shutil.disk_usage(SHM_DIR).free > nbytes
+
+
+# ---------------------------------------------------
+# PARENT SIDE
+# ---------------------------------------------------
+def share_page(image):
+    """
+    Copy a page image into a new shared memory block.
+
+    Returns:
+        (SharedPage, block), or (image, None) when the page cannot be
+        shared and is pickled as before. The caller owns the block and
+        frees it with release() once the worker has returned.
+    """
+    if (
+        not SHARED_PAGES_ENABLED or
+        not isinstance(image, np.ndarray) or
+        image.nbytes == 0 or
+        not _has_room(image.nbytes)
+    ):
+        return image, None
+
+    try:
+        block = shared_memory.SharedMemory(create=True, size=image.nbytes)
+    except OSError:
+        return image, None
+
+    np.ndarray(image.shape, image.dtype, buffer=block.buf)[...] = image
+
+    return SharedPage(block.name, image.shape, image.dtype.str), block
+
+
+def release(block):
+    """
+    Free a block created by share_page() (no-op for None).
+    Workers that still map it keep their view until they close it.
+    """
+    if block is None:
+        return
+
+    block.close()
+
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        pass
+
+
+# ---------------------------------------------------
+# WORKER SIDE
+# ---------------------------------------------------
+@contextmanager
+def attach(page):
+    """
+    The image behind a SharedPage, mapped without copying; crops of it
+    are views into the same block. Plain arrays are passed through.
+
+    Drop every reference to the image before leaving the block, so the
+    mapping can be closed.
+    """
+    _close_lingering()
+
+    if not isinstance(page, SharedPage):
+        yield page
+        return
+
+    block = shared_memory.SharedMemory(name=page.name)
+
+    try:
+        # frombuffer holds an export on the block's buffer (np.ndarray
+        # with buffer= does not), so close() refuses while views live
+        yield np.frombuffer(block.buf, np.dtype(page.dtype)).reshape(page.shape)
+    finally:
+        _close(block)
+
+
+def _close(block):
+    try:
+        block.close()
+    except BufferError:
+        # a crop is still in use, e.g. by a speculative engine that
+        # lost its race; retried on the next attach
+        _lingering.append(block)
+
+
+def _close_lingering():
+    for block in list(_lingering):
+        try:
+            block.close()
+            _lingering.remove(block)
+        except BufferError:
+            pass
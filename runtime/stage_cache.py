@@ -0,0 +1,97 @@
+import os
+import tempfile
+import threading
+
+from runtime.result_cache import ResultCache, hash_image, make_key
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# Memoize layout boxes, OCR words and PPStructure HTML per input image
+STAGE_CACHE_ENABLED = os.environ.get("DOCUSTRUCT_STAGE_CACHE", "0") == "1"
+
+# One SQLite file per stage inside this directory
+STAGE_CACHE_DIR = os.environ.get(
+    "DOCUSTRUCT_STAGE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "docustruct_cache", "stages")
+)
+
+# Size of each stage cache before least recently used entries are evicted
+STAGE_CACHE_MAX_MB = int(os.environ.get("DOCUSTRUCT_STAGE_CACHE_MB", "1024"))
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_stage_cache(stage):
+    """
+    The cache of one stage ("layout", "ocr", "pp_structure").
+    Separate stores keep a huge OCR cache from evicting layout boxes.
+    """
+    with _caches_lock:
+
+        if stage not in _caches:
+            _caches[stage] = ResultCache(
+                os.path.join(STAGE_CACHE_DIR, f"{stage}.sqlite"),
+                max_bytes=STAGE_CACHE_MAX_MB * 1024 * 1024
+            )
+
+        return _caches[stage]
+
+
+def stage_key(stage, image, version):
+    """
+    Key of a stage output: the input pixels plus the model version.
+    """
+    return make_key(hash_image(image).hexdigest(), {"stage": stage, "version": version})
+
+
+def lookup(stage, key):
+    """
+    Returns:
+        (True, value) on a hit, (False, None) otherwise
+    """
+    cached = get_stage_cache(stage).get(key)
+
+    if cached is None:
+        return False, None
+
+    return True, cached[0]["value"]
+
+
+def store(stage, key, value):
+    get_stage_cache(stage).put(key, {"value": value})
+
+
+def memoize(stage, image, version, compute, encode=None, decode=None):
+    """
+    Return compute() for this image, from the stage cache when possible.
+
+    Args:
+        encode / decode: convert the value to and from JSON-friendly data
+    """
+    if not STAGE_CACHE_ENABLED:
+        return compute()
+
+    key = stage_key(stage, image, version)
+
+    found, value = lookup(stage, key)
+
+    if found:
+        return decode(value) if decode else value
+
+    value = compute()
+
+    store(stage, key, encode(value) if encode else value)
+
+    return value
+
+
+def stage_cache_stats():
+    with _caches_lock:
+        caches = dict(_caches)
+
+    return {stage: cache.stats() for stage, cache in caches.items()}
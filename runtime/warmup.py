@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+
+# ---------------------------------------------------
+# CONFIG
+# ---------------------------------------------------
+
+# Run the warm-up when the app starts (off by default)
+WARMUP_ON_START = os.environ.get("DOCUSTRUCT_WARMUP", "0") == "1"
+
+# Port for the readiness probe, 0 disables the HTTP endpoint
+READINESS_PORT = int(os.environ.get("DOCUSTRUCT_READINESS_PORT", "0"))
+
+
+# ---------------------------------------------------
+# READINESS STATE
+# ---------------------------------------------------
+_ready = threading.Event()
+_started = False
+_start_lock = threading.Lock()
+
+_state = {
+    "status": "cold",
+    "timings": {},
+    "error": None
+}
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def readiness():
+    """
+    Snapshot of the warm-up state, suitable for a health endpoint.
+
+    build_times lists every pooled instance built so far, per engine:
+    layout, OCR and PPStructure are all pooled (see engine_pool), so
+    this is where their startup cost shows. load_times only covers
+    engines loaded once through get_model(), none in the pipeline
+    today, so it is normally empty.
+    """
+    from runtime.model_registry import registry
+
+    return {
+        "ready": is_ready(),
+        "status": _state["status"],
+        "timings": dict(_state["timings"]),
+        "load_times": registry.load_times(),
+        "build_times": registry.build_times(),
+        "error": _state["error"]
+    }
+
+
+# ---------------------------------------------------
+# SYNTHETIC PAGE
+# ---------------------------------------------------
+def build_synthetic_page(width=1240, height=1754):
+    """
+    A white A4-like page with one ruled invoice table on it.
+
+    Returns:
+        (page, table_bbox)
+    """
+    page = np.full((height, width, 3), 255, dtype=np.uint8)
+
+    cv2.putText(page, "INVOICE", (80, 160), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (0, 0, 0), 4)
+
+    x1, y1, x2, y2 = 80, 400, width - 80, 900
+    rows = 6
+    cols = 4
+
+    row_h = (y2 - y1) // rows
+    col_w = (x2 - x1) // cols
+
+    for r in range(rows + 1):
+        y = y1 + r * row_h
+        cv2.line(page, (x1, y), (x2, y), (0, 0, 0), 2)
+
+    for c in range(cols + 1):
+        x = x1 + c * col_w
+        cv2.line(page, (x, y1), (x, y1 + rows * row_h), (0, 0, 0), 2)
+
+    header = ["Item", "Qty", "Price", "Total"]
+
+    for r in range(rows):
+        for c in range(cols):
+            text = header[c] if r == 0 else f"{(r * 7 + c * 3) % 90 + 10}.00"
+            org = (x1 + c * col_w + 15, y1 + r * row_h + row_h // 2 + 10)
+            cv2.putText(page, text, org, cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 0), 2)
+
+    return page, (x1, y1, x2, y1 + rows * row_h)
+
+
+# ---------------------------------------------------
+# WARM-UP
+# ---------------------------------------------------
+def _timed(name, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = round(time.perf_counter() - start, 3)
+
+    _state["timings"][name] = elapsed
+    print(f"Warm-up '{name}' took {elapsed:.2f} sec")
+
+
+def warm_up():
+    """
+    Push a synthetic page through detect_layout, run_ocr and
+    TableStructureExtractor.extract_tables, then mark the process ready.
+
+    Every pooled OCR / PPStructure instance gets one inference, so the
+    first real request does not pay for lazy allocation.
+    """
+    # imported here so the readiness probe itself stays lightweight
+    from layout_detection.layout_model import detect_layout
+    from ocr.ocr_engine import run_ocr, OCR_MODEL_NAME
+    from structure.table_structure_extractor import (
+        TableStructureExtractor,
+        PP_STRUCTURE_MODEL_NAME,
+        PP_TABLE_MODEL_NAME,
+        PP_TABLE_ONLY
+    )
+    from table_extraction.table_cropper import crop_table
+    from runtime.engine_pool import get_pool
+
+    _state["status"] = "warming"
+    _state["error"] = None
+
+    try:
+        total_start = time.perf_counter()
+
+        page, bbox = build_synthetic_page()
+        crop = crop_table(page, bbox)
+
+        _timed("layout", lambda: detect_layout(page))
+
+        _timed("ocr", lambda: get_pool(OCR_MODEL_NAME).warm(lambda e: e.ocr(crop)))
+        _timed("ocr_pipeline", lambda: run_ocr(crop))
+
+        pp_model = PP_TABLE_MODEL_NAME if PP_TABLE_ONLY else PP_STRUCTURE_MODEL_NAME
+        _timed("pp_structure", lambda: get_pool(pp_model).warm(lambda e: e(crop)))
+        _timed("pp_structure_pipeline", lambda: TableStructureExtractor().extract_tables(crop))
+
+        _state["timings"]["total"] = round(time.perf_counter() - total_start, 3)
+        _state["status"] = "ready"
+        _ready.set()
+
+        print(f"Warm-up completed in {_state['timings']['total']:.2f} sec")
+
+    except Exception as e:
+        _state["status"] = "failed"
+        _state["error"] = str(e)
+        print(f"Warm-up failed: {e}")
+
+    return readiness()
+
+
+def start_warmup_in_background():
+    """
+    Start warm-up once per process on a daemon thread.
+    Safe to call on every Streamlit rerun.
+    """
+    global _started
+
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+
+    if READINESS_PORT:
+        start_readiness_server(READINESS_PORT)
+
+    threading.Thread(target=warm_up, name="docustruct-warmup", daemon=True).start()
+
+
+# ---------------------------------------------------
+# READINESS ENDPOINT
+# ---------------------------------------------------
+class _ReadinessHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+
+        if self.path.rstrip("/") not in ("/ready", "/readyz"):
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = json.dumps(readiness()).encode("utf-8")
+
+        # load balancers only need the status code
+        self.send_response(200 if is_ready() else 503)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # keep probe traffic out of the console
+        pass
+
+
+def start_readiness_server(port, host="0.0.0.0"):
+    """
+    Serve GET /ready: 200 once warm-up finished, 503 before that.
+    """
+    server = ThreadingHTTPServer((host, port), _ReadinessHandler)
+
+    threading.Thread(
+        target=server.serve_forever,
+        name="docustruct-readiness",
+        daemon=True
+    ).start()
+
+    print(f"Readiness probe listening on {host}:{port}/ready")
+
+    return server
@@ -13,11 +13,11 @@ def detect_table_lines(table_image):
         Dictionary with detected horizontal and vertical lines
     """
 
-    # Convert to grayscale if needed
+    # Convert to grayscale if needed (Canny only reads its input)
     if len(table_image.shape) == 3:
         gray = cv2.cvtColor(table_image, cv2.COLOR_BGR2GRAY)
     else:
-        gray = table_image.copy()
+        gray = table_image
 
     # Edge detection to highlight lines
     edges = cv2.Canny(gray, 50, 150, apertureSize=3)
@@ -1,18 +1,230 @@
-from paddleocr import PPStructure
+import hashlib
+import json
+import os
+
+import cv2
+import numpy as np
+
+from runtime.model_registry import register_model
+from runtime.engine_pool import get_pool
+from runtime.result_cache import package_version
+from runtime.stage_cache import memoize
+from ocr.ocr_engine import build_word, DEFAULT_DROP_SCORE
 # from paddleocr.ppstructure.recovery.recovery_to_doc import sorted_layout_boxes
 
+# Name of the engine inside the model registry
+PP_STRUCTURE_MODEL_NAME = "pp_structure"
+
+# Table-recognition-only engine (layout analysis off, our OCR supplied)
+PP_TABLE_MODEL_NAME = "pp_table"
+
+# Crops are already tables (YOLO found them), so skip PPStructure's own
+# layout pass and feed its table recognizer the words we OCR anyway
+PP_TABLE_ONLY = os.environ.get("DOCUSTRUCT_PP_TABLE_ONLY", "0") == "1"
+
+# Share of the crop's text area PPStructure's words must span before
+# the fallback reuses them instead of running OCR again
+PP_WORDS_MIN_COVERAGE = float(os.environ.get("DOCUSTRUCT_PP_WORDS_MIN_COVERAGE", "0.8"))
+
+
+def load_pp_structure():
+    from paddleocr import PPStructure
+
+    return PPStructure(
+        show_log=False,
+        use_gpu=False
+    )
+
+
+def load_pp_table_recognizer():
+    from paddleocr import PPStructure
+
+    # layout=False: the whole image is one table region
+    # ocr=False: no text system for non-table regions
+    return PPStructure(
+        show_log=False,
+        use_gpu=False,
+        layout=False,
+        ocr=False
+    )
+
+
+# Instances are built lazily by the engine pool on first extract_tables() call
+register_model(PP_STRUCTURE_MODEL_NAME, load_pp_structure)
+register_model(PP_TABLE_MODEL_NAME, load_pp_table_recognizer)
+
+
+def model_version():
+    return {"paddleocr": package_version("paddleocr")}
+
+
+def words_to_ocr_result(words, scale=1.0):
+    """
+    OCR words in the (dt_boxes, rec_res) form PPStructure's TableSystem
+    produces itself: xyxy boxes and (text, score) pairs.
+    """
+    dt_boxes = np.array(
+        [[w["x1"], w["y1"], w["x2"], w["y2"]] for w in words],
+        dtype=np.float32
+    ).reshape(-1, 4) * scale
+
+    rec_res = [(w["text"], float(w.get("confidence", 1.0))) for w in words]
+
+    return dt_boxes, rec_res
+
+
+# Cell style tokens emitted by the PubTabNet-trained table recognizer
+STYLE_TOKENS = (
+    "<strike>", "</strike>", "<sup>", "</sup>", "<sub>", "</sub>",
+    "<b>", "</b>", "<i>", "</i>",
+    "<overline>", "</overline>", "<underline>", "</underline>"
+)
+
+
+def _clean_text(text):
+    for token in STYLE_TOKENS:
+        text = text.replace(token, "")
+    return text
+
+
+def _to_points(box, dx=0, dy=0):
+    """
+    xyxy or polygon box -> list of [x, y] points, shifted by (dx, dy).
+    """
+    pts = np.asarray(box, dtype=np.float64)
+
+    if pts.size == 4:
+        x1, y1, x2, y2 = pts.ravel()
+        pts = np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]])
+    else:
+        pts = pts.reshape(-1, 2)
+
+    return [[float(x) + dx, float(y) + dy] for x, y in pts]
+
+
+def collect_ocr_words(result, drop_score=DEFAULT_DROP_SCORE):
+    """
+    The text PPStructure recognized while building its tables, as word
+    dicts (run_ocr schema) in the coordinates of the image it was given.
+
+    Only table regions are read (res["boxes"] / res["rec_res"], relative
+    to the region): text regions hold isolated lines, not the table body.
+    """
+    words = []
+
+    for region in result:
+
+        res = region.get("res")
+        x0, y0 = (region.get("bbox") or [0, 0])[:2]
+
+        if region.get("type") != "table" or not isinstance(res, dict):
+            continue
+
+        pairs = [
+            (_to_points(box, x0, y0), text_info)
+            for box, text_info in zip(res.get("boxes", []), res.get("rec_res", []))
+        ]
+
+        for points, text_info in pairs:
+
+            text, conf = text_info[0], float(text_info[1])
+
+            if conf < drop_score:
+                continue
+
+            word = build_word(points, (_clean_text(str(text)), conf))
+
+            if word is not None:
+                words.append(word)
+
+    return words
+
+
+def text_coverage(words, image):
+    """
+    Share of the image's text area (bounding box of its ink) that the
+    bounding box of `words` spans. 1.0 for an image without ink.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+    ink = cv2.findNonZero((gray < 240).astype(np.uint8))
+
+    if ink is None:
+        return 1.0
+
+    if not words:
+        return 0.0
+
+    x, y, w, h = cv2.boundingRect(ink)
+
+    wx1 = max(x, min(wd["x1"] for wd in words))
+    wy1 = max(y, min(wd["y1"] for wd in words))
+    wx2 = min(x + w, max(wd["x2"] for wd in words))
+    wy2 = min(y + h, max(wd["y2"] for wd in words))
+
+    covered = max(0, wx2 - wx1) * max(0, wy2 - wy1)
+
+    return covered / float(w * h)
+
+
+def _words_digest(words, scale):
+    text = json.dumps([words, scale], sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
 
 class TableStructureExtractor:
 
-    def __init__(self):
-        self.engine = PPStructure(
-            show_log=False,
-            use_gpu=False
+    def __init__(self, table_only=None):
+        self.table_only = PP_TABLE_ONLY if table_only is None else table_only
+
+        # engines are shared across requests, constructing the extractor is free
+        self.pool = get_pool(
+            PP_TABLE_MODEL_NAME if self.table_only else PP_STRUCTURE_MODEL_NAME
         )
 
-    def extract_tables(self, image):
+    def extract_tables(self, image, words=None, word_scale=1.0):
+        """
+        HTML of every table PPStructure finds in the image.
 
-        result = self.engine(image)
+        Args:
+            words: OCR words of the image (run_ocr schema); in
+                table-only mode they replace PPStructure's own OCR
+            word_scale: factor from word coordinates to image coordinates
+        """
+        return self.extract_tables_with_words(image, words, word_scale)[0]
+
+    def extract_tables_with_words(self, image, words=None, word_scale=1.0):
+        """
+        extract_tables() plus the words PPStructure recognized on the way
+        (memoized per image when DOCUSTRUCT_STAGE_CACHE=1).
+
+        Returns:
+            (list of table HTML, list of words; empty when our own
+            words were supplied or PPStructure produced none)
+        """
+        if not self.table_only or not words:
+            words = None
+
+        version = {**model_version(), "table_only": self.table_only, "ocr_words": 2}
+
+        if words is not None:
+            version["words"] = _words_digest(words, word_scale)
+
+        tables, ocr_words = memoize(
+            "pp_structure", image, version,
+            lambda: self._extract_tables(image, words, word_scale)
+        )
+
+        return tables, ocr_words
+
+    def _extract_tables(self, image, words=None, word_scale=1.0):
+
+        with self.pool.lease() as engine:
+
+            if words is not None:
+                result = self._recognize_with_words(engine, image, words, word_scale)
+            else:
+                result = engine(image, return_ocr_result_in_table=True)
 
         tables = []
 
@@ -25,5 +237,31 @@ class TableStructureExtractor:
                 if table_html:
                     tables.append(table_html)
 
-        return tables
+        ocr_words = [] if words is not None else collect_ocr_words(result)
+
+        return tables, ocr_words
+
+    @staticmethod
+    def _recognize_with_words(engine, image, words, word_scale):
+        """
+        Run the table recognizer with our words in place of its OCR.
+
+        TableSystem runs structure prediction, then _ocr() for text
+        boxes, then matches the two; only _ocr() is swapped, on the
+        engine this thread has leased.
+        """
+        table_system = getattr(engine, "table_system", None)
+
+        if table_system is None:
+            return engine(image)
+
+        dt_boxes, rec_res = words_to_ocr_result(words, word_scale)
+
+        table_system._ocr = lambda img: (dt_boxes, rec_res, 0.0, 0.0)
+
+        try:
+            return engine(image)
+        finally:
+            # back to the class method
+            del table_system._ocr
 
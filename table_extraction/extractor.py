@@ -1,5 +1,12 @@
-from table_extraction.table_cropper import crop_table, remove_white_margins
-from table_extraction.orientation import deskew_image
+import numpy as np
+
+from table_extraction.table_cropper import (
+    crop_table,
+    crop_table_with_offset,
+    remove_white_margins,
+    remove_white_margins_with_offset
+)
+from table_extraction.orientation import deskew_image, deskew_image_with_matrix
 
 
 def extract_clean_table(image, bbox):
@@ -7,3 +14,25 @@ def extract_clean_table(image, bbox):
     table = deskew_image(table)
     table = remove_white_margins(table)
     return table
+
+
+def _translation(dx, dy):
+    return np.array([[1, 0, dx], [0, 1, dy], [0, 0, 1]], dtype=np.float64)
+
+
+def extract_clean_table_with_transform(image, bbox):
+    """
+    Same as extract_clean_table(), also returning the 2x3 affine matrix
+    that maps page coordinates to coordinates in the returned table image.
+    """
+    table, (ox, oy) = crop_table_with_offset(image, bbox)
+    transform = _translation(-ox, -oy)
+
+    table, M = deskew_image_with_matrix(table)
+    if M is not None:
+        transform = np.vstack([M, [0, 0, 1]]) @ transform
+
+    table, (mx, my) = remove_white_margins_with_offset(table)
+    transform = _translation(-mx, -my) @ transform
+
+    return table, transform[:2]
@@ -27,10 +27,20 @@ def deskew_image(image):
     """
     Rotate image to correct skew.
     """
+    rotated, _ = deskew_image_with_matrix(image)
+
+    return rotated
+
+
+def deskew_image_with_matrix(image):
+    """
+    Same as deskew_image(), also returning the 2x3 rotation matrix
+    (None when no correction was applied).
+    """
     angle = detect_skew_angle(image)
 
     if abs(angle) < 1.0:
-        return image  # no correction needed
+        return image, None  # no correction needed
 
     h, w = image.shape[:2]
     center = (w // 2, h // 2)
@@ -42,4 +52,5 @@ def deskew_image(image):
         borderMode=cv2.BORDER_REPLICATE
     )
 
-    return rotated
+    return rotated, M
+
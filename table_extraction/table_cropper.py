@@ -6,6 +6,15 @@ def crop_table(image, bbox, padding=10):
     """
     Crop table from full invoice image.
     """
+    table_img, _ = crop_table_with_offset(image, bbox, padding)
+
+    return table_img
+
+
+def crop_table_with_offset(image, bbox, padding=10):
+    """
+    Same as crop_table(), also returning the (x, y) page offset of the crop.
+    """
     h, w = image.shape[:2]
     x1, y1, x2, y2 = bbox
 
@@ -17,21 +26,32 @@ def crop_table(image, bbox, padding=10):
 
     table_img = image[y1:y2, x1:x2]
 
-    return table_img
+    return table_img, (x1, y1)
 
 
 def remove_white_margins(table_img):
     """
     Remove extra white borders around the table.
     """
+    cropped, _ = remove_white_margins_with_offset(table_img)
+
+    return cropped
+
+
+def remove_white_margins_with_offset(table_img):
+    """
+    Same as remove_white_margins(), also returning the (x, y) offset
+    of the kept region.
+    """
     gray = cv2.cvtColor(table_img, cv2.COLOR_BGR2GRAY)
-    _, thresh = cv2.threshold(gray, 240, 255, cv2.THRESH_BINARY_INV)
+    # threshold into the gray buffer, it is not needed afterwards
+    _, thresh = cv2.threshold(gray, 240, 255, cv2.THRESH_BINARY_INV, dst=gray)
 
     coords = cv2.findNonZero(thresh)
     if coords is None:
-        return table_img
+        return table_img, (0, 0)
 
     x, y, w, h = cv2.boundingRect(coords)
     cropped = table_img[y:y+h, x:x+w]
 
-    return cropped
+    return cropped, (x, y)
@@ -0,0 +1,32 @@
+import glob
+
+from preprocessing.image_cleaner import load_image
+from layout_detection.layout_model import detect_layout, detect_layout_batch
+
+
+def test():
+    INPUT_IMAGES = sorted(glob.glob("test_images/*.jpg"))
+
+    if not INPUT_IMAGES:
+        print("No test images found")
+        return
+
+    print(f"Loading {len(INPUT_IMAGES)} images...")
+    images = [load_image(path) for path in INPUT_IMAGES]
+
+    print("Detecting layout page by page...")
+    single = [detect_layout(image) for image in images]
+
+    print("Detecting layout in batches...")
+    batched = detect_layout_batch(images, batch_size=4)
+
+    assert len(batched) == len(images)
+
+    for path, one, many in zip(INPUT_IMAGES, single, batched):
+        print(f"{path}: single={len(one.tables)} tables, batch={len(many.tables)} tables")
+
+    print("Step-12 test completed.")
+
+
+if __name__ == "__main__":
+    test()
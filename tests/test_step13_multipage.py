@@ -0,0 +1,36 @@
+import glob
+
+from preprocessing.image_cleaner import load_pages
+from app_entry import run_document
+
+
+def test():
+    INPUT_PDFS = sorted(glob.glob("test_images/*.pdf"))
+
+    if not INPUT_PDFS:
+        print("No test PDFs found")
+        return
+
+    for path in INPUT_PDFS:
+
+        print(f"Loading {path}...")
+        pages = load_pages(path)
+
+        print(f"Processing {len(pages)} pages on 2 workers...")
+        result = run_document(pages, workers=2)
+
+        if "error" in result:
+            print(f"Extraction failed: {result['error']}")
+            continue
+
+        for page in result["page_metrics"]:
+            print(f"Page {page['page']}: {page['table_count']} tables, "
+                  f"{page['processing_time_sec']} sec")
+
+        print(f"Document: {result['metrics']}")
+
+    print("Step-13 test completed.")
+
+
+if __name__ == "__main__":
+    test()
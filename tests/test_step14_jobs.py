@@ -0,0 +1,38 @@
+import glob
+
+from runtime.jobs import JobManager
+
+
+def test():
+    INPUT_FILES = sorted(glob.glob("test_images/*.pdf") + glob.glob("test_images/*.jpg"))
+
+    if not INPUT_FILES:
+        print("No test documents found")
+        return
+
+    jobs = JobManager(workers=2)
+
+    job_ids = {jobs.submit(path): path for path in INPUT_FILES}
+
+    print(f"Submitted {len(job_ids)} jobs")
+
+    for job_id, path in job_ids.items():
+
+        status = jobs.wait(job_id)
+
+        print(f"{path}: {status['status']} "
+              f"({status['pages_done']}/{status['pages_total']} pages)")
+
+        if status["status"] == "done":
+            print(f"  Metrics: {jobs.result(job_id)['metrics']}")
+            print(f"  Excel: {len(jobs.excel(job_id))} bytes")
+        else:
+            print(f"  Error: {status['error']}")
+
+    jobs.shutdown()
+
+    print("Step-14 test completed.")
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,93 @@
+import threading
+import time
+
+from runtime.engine_pool import EnginePool
+
+
+class CountingEngine:
+    """
+    Stand-in engine that records overlapping use.
+    """
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def run(self):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+        time.sleep(0.01)
+
+        with self.lock:
+            self.active -= 1
+
+
+def test():
+    pool = EnginePool("test", CountingEngine, size=2)
+
+    used = []
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(5):
+                with pool.lease(timeout=10) as engine:
+                    used.append(engine)
+                    engine.run()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    engines = {id(e): e for e in used}
+
+    assert not errors, errors
+    assert len(engines) <= 2, "pool built more engines than its size"
+    assert all(e.max_active == 1 for e in engines.values()), "engine used by two threads at once"
+    print(f"Exclusivity: {len(used)} leases on {len(engines)} engines, no overlap")
+
+    # re-entrancy: nested leases in one thread get the same engine
+    # and do not use up the pool
+    pool = EnginePool("test", CountingEngine, size=1)
+
+    with pool.lease(timeout=1) as outer:
+        with pool.lease(timeout=1) as inner:
+            assert inner is outer
+
+        assert pool.stats()["in_use"] == 1
+
+    assert pool.stats()["in_use"] == 0
+    assert pool.stats()["idle"] == 1
+    print("Re-entrancy: nested lease returned the held engine")
+
+    # releasing from another thread is refused
+    engine = pool.checkout(timeout=1)
+    errors = []
+
+    def foreign_release():
+        try:
+            pool.release(engine)
+        except RuntimeError as e:
+            errors.append(e)
+
+    t = threading.Thread(target=foreign_release)
+    t.start()
+    t.join()
+
+    assert errors, "release by a non-owner thread was accepted"
+    pool.release(engine)
+    print("Ownership: release by another thread rejected")
+
+    print("Step-15 test completed.")
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,107 @@
+import cv2
+import numpy as np
+
+from ocr.page_ocr import WordIndex, slice_words
+from table_extraction.extractor import extract_clean_table_with_transform
+
+
+SKEW_DEG = 3.0
+
+
+def build_skewed_page():
+    """
+    A ruled table with a black marker in every cell, rotated by a few
+    degrees, plus the markers' page-space word boxes (what a page-level
+    OCR pass would return) and one word outside the table.
+    """
+    page = np.full((1200, 1600, 3), 255, dtype=np.uint8)
+
+    x1, y1, x2, y2 = 200, 300, 1400, 900
+
+    for y in range(y1, y2 + 1, 100):
+        cv2.line(page, (x1, y), (x2, y), (0, 0, 0), 3)
+    for x in range(x1, x2 + 1, 300):
+        cv2.line(page, (x, y1), (x, y2), (0, 0, 0), 3)
+
+    centers = {}
+
+    for r in range(6):
+        for c in range(4):
+            cx, cy = x1 + 150 + 300 * c, y1 + 50 + 100 * r
+            cv2.rectangle(page, (cx - 20, cy - 15), (cx + 20, cy + 15), (0, 0, 0), -1)
+            centers[f"r{r}c{c}"] = (cx, cy)
+
+    R = cv2.getRotationMatrix2D((800, 600), SKEW_DEG, 1.0)
+    page = cv2.warpAffine(page, R, (1600, 1200), borderValue=(255, 255, 255))
+
+    def rotate(x, y):
+        return R @ np.array([x, y, 1.0])
+
+    words = []
+
+    for text, (cx, cy) in centers.items():
+        px, py = rotate(cx, cy)
+        words.append({
+            "text": text,
+            "x1": int(px - 18), "y1": int(py - 13),
+            "x2": int(px + 18), "y2": int(py + 13),
+            "confidence": 0.99
+        })
+
+    words.append({"text": "outside", "x1": 60, "y1": 1100, "x2": 160, "y2": 1130, "confidence": 0.99})
+
+    corners = np.array([rotate(x, y) for x, y in ((x1, y1), (x2, y1), (x2, y2), (x1, y2))])
+    bbox = (
+        int(corners[:, 0].min()) - 20, int(corners[:, 1].min()) - 20,
+        int(corners[:, 0].max()) + 20, int(corners[:, 1].max()) + 20
+    )
+
+    return page, words, bbox
+
+
+def is_ink(gray, x, y):
+    return gray[int(round(y)), int(round(x))] < 128
+
+
+def test():
+    page, words, bbox = build_skewed_page()
+
+    table_img, transform = extract_clean_table_with_transform(page, bbox)
+    gray = cv2.cvtColor(table_img, cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape
+
+    # the crop must actually be deskewed, not only translated
+    assert abs(transform[0, 1]) > 1e-3, "table was not deskewed"
+    print(f"Crop {table_img.shape}, transform:\n{np.round(transform, 3)}")
+
+    # page -> crop affine: every marker center lands on its marker
+    for word in words[:-1]:
+        px = (word["x1"] + word["x2"]) / 2
+        py = (word["y1"] + word["y2"]) / 2
+
+        cx, cy = transform @ np.array([px, py, 1.0])
+
+        assert 0 <= cx < w and 0 <= cy < h, f"{word['text']} mapped outside the crop"
+        assert is_ink(gray, cx, cy), f"{word['text']} mapped off its marker"
+
+    print("Affine mapping: all markers land on ink in the crop")
+
+    # slice_words: the table's words, in crop space, and nothing else
+    sliced = slice_words(WordIndex(words), transform, table_img.shape)
+
+    texts = {wd["text"] for wd in sliced}
+
+    assert "outside" not in texts
+    assert texts == {wd["text"] for wd in words[:-1]}, texts
+
+    for wd in sliced:
+        assert 0 <= wd["x1"] < wd["x2"] <= w and 0 <= wd["y1"] < wd["y2"] <= h
+        assert is_ink(gray, (wd["x1"] + wd["x2"]) / 2, (wd["y1"] + wd["y2"]) / 2), wd
+
+    print(f"slice_words: {len(sliced)} words in crop coordinates")
+
+    print("Step-16 test completed.")
+
+
+if __name__ == "__main__":
+    test()
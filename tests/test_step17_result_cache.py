@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import time
+
+from runtime.result_cache import ResultCache
+
+
+def entry(name):
+    # ~100 bytes once serialized
+    return {"name": name, "data": "x" * 80}
+
+
+def test():
+    with tempfile.TemporaryDirectory() as tmp:
+
+        one = len(json.dumps(entry("a")))
+
+        cache = ResultCache(os.path.join(tmp, "results.sqlite"), max_bytes=3 * one + one // 2)
+
+        for key in ("a", "b", "c"):
+            cache.put(key, entry(key), None)
+            time.sleep(0.01)
+
+        assert cache.stats()["entries"] == 3
+
+        # touching "a" makes "b" the least recently used
+        assert cache.get("a")[0]["name"] == "a"
+        time.sleep(0.01)
+
+        cache.put("d", entry("d"), None)
+
+        assert cache.get("b") is None, "least recently used entry was kept"
+        for key in ("a", "c", "d"):
+            assert cache.get(key) is not None, f"{key} evicted out of LRU order"
+            time.sleep(0.01)
+
+        print("LRU order: 'b' evicted after 'a' was read")
+
+        # last reads went a, c, d: a larger entry evicts a, then c
+        cache.put("e", entry("e"), b"y" * one)
+
+        assert cache.get("c") is None and cache.get("a") is None
+        assert cache.get("d") is not None and cache.get("e") is not None
+
+        stats = cache.stats()
+        assert stats["size_bytes"] <= stats["max_bytes"], stats
+        print(f"Size cap: {stats['size_bytes']} <= {stats['max_bytes']} bytes")
+
+        # an entry larger than the whole cache is not stored
+        cache.put("huge", entry("huge"), b"z" * (stats["max_bytes"] + 1))
+
+        assert cache.get("huge") is None
+        assert cache.get("d") is not None
+        print("Oversized entry skipped without evicting others")
+
+        cache._db.close()
+
+    print("Step-17 test completed.")
+
+
+if __name__ == "__main__":
+    test()
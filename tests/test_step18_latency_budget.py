@@ -0,0 +1,50 @@
+import pickle
+import time
+
+from pipeline.budget import LatencyBudget
+
+
+def document_budget(total_sec, used):
+    # a document budget of which `used` seconds have already passed
+    return LatencyBudget(total_sec, degrade_at=0.5, start=time.time() - used)
+
+
+def test():
+    # a fresh child never outlasts its document budget, whatever its size
+    for child_sec in (0, 1, 1000):
+        for used, tight, exhausted in ((0.1, False, False), (6, True, False), (11, True, True)):
+
+            child = document_budget(10, used).child(child_sec)
+
+            assert child.is_tight() == tight, (child_sec, used)
+            assert child.is_exhausted() == exhausted, (child_sec, used)
+            assert child.limited
+
+    print("Parent bound: fresh children are tight / exhausted with their document")
+
+    # a child can run out before its parent, never the other way round
+    parent = document_budget(10, 0.1)
+    child = LatencyBudget(1, degrade_at=0.5, start=time.time() - 2, parent=parent)
+
+    assert child.is_exhausted() and not parent.is_exhausted()
+    print("Own limit: a table budget runs out before a roomy document budget")
+
+    # grandchildren inherit the chain
+    grandchild = document_budget(10, 11).child(1000).child(1000)
+    assert grandchild.is_exhausted()
+
+    # no limit anywhere: never tight
+    free = LatencyBudget().child(0)
+    assert not free.limited and not free.is_tight() and not free.is_exhausted()
+    print("Unlimited: no budget set means no degradation")
+
+    # page workers get budgets pickled; the parent chain survives
+    restored = pickle.loads(pickle.dumps(document_budget(10, 11).child(1000)))
+    assert restored.is_exhausted()
+    print("Pickle: parent chain kept across processes")
+
+    print("Step-18 test completed.")
+
+
+if __name__ == "__main__":
+    test()
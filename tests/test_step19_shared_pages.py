@@ -0,0 +1,80 @@
+import multiprocessing as mp
+import os
+import pickle
+
+import numpy as np
+
+from runtime import shared_pages
+from runtime.shared_pages import SharedPage, attach, release, share_page
+
+
+def shm_blocks():
+    if not os.path.isdir(shared_pages.SHM_DIR):
+        return set()
+    return {f for f in os.listdir(shared_pages.SHM_DIR) if f.startswith("psm_")}
+
+
+def page_checksum(page):
+    # runs in a spawned worker, like app_entry._page_worker
+    with attach(page) as image:
+        total = int(image.sum(dtype=np.int64))
+        shape = image.shape
+        del image
+    return total, shape
+
+
+def test():
+    before = shm_blocks()
+
+    page = np.random.default_rng(0).integers(0, 256, (350, 248, 3), dtype=np.uint8)
+
+    # share -> attach in another process -> release
+    shared, block = share_page(page)
+
+    assert isinstance(shared, SharedPage) and block is not None
+    assert len(shm_blocks() - before) == 1
+
+    with mp.get_context("spawn").Pool(1) as pool:
+        total, shape = pool.apply(page_checksum, (shared,))
+
+    assert total == int(page.sum(dtype=np.int64)) and shape == page.shape
+    print(f"Worker read the shared page: {shape}, descriptor {len(pickle.dumps(shared))} bytes")
+
+    release(block)
+    release(block)
+    assert shm_blocks() == before, "shared memory block left behind"
+    print("Release: no /dev/shm leftovers (double release is harmless)")
+
+    # a crop still alive when attach() exits is closed on the next attach
+    shared, block = share_page(page)
+
+    with attach(shared) as image:
+        crop = image[10:20, 10:20]
+        del image
+
+    assert len(shared_pages._lingering) == 1
+
+    del crop
+
+    with attach(page) as image:
+        assert image is page
+
+    assert not shared_pages._lingering
+    release(block)
+    assert shm_blocks() == before
+    print("Lingering: block closed once its last crop was dropped")
+
+    # plain pickling when sharing is off
+    shared_pages.SHARED_PAGES_ENABLED = False
+    try:
+        shared, block = share_page(page)
+        assert shared is page and block is None
+    finally:
+        shared_pages.SHARED_PAGES_ENABLED = True
+    print("Disabled: pages passed through unchanged")
+
+    print("Step-19 test completed.")
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,50 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+from runtime import process_pool
+from runtime.process_pool import discard_process_pool, get_process_pool, is_broken
+
+
+def crash():
+    # a worker killed by a segfault / OOM looks the same to the pool
+    os._exit(1)
+
+
+def test():
+    pool = get_process_pool(2)
+
+    assert pool.submit(pow, 2, 10).result() == 1024
+    assert get_process_pool(2) is pool
+    print("Cached: same pool for the same worker count")
+
+    try:
+        pool.submit(crash).result()
+        raise AssertionError("worker crash not reported")
+    except BrokenProcessPool:
+        pass
+
+    assert is_broken(pool)
+
+    # the next caller gets fresh workers instead of BrokenProcessPool
+    fresh = get_process_pool(2)
+    assert fresh is not pool
+    assert fresh.submit(pow, 3, 3).result() == 27
+    print("Broken: replaced on the next call")
+
+    # evicted explicitly by the caller that saw the crash
+    try:
+        fresh.submit(crash).result()
+    except BrokenProcessPool:
+        discard_process_pool(fresh)
+
+    assert 2 not in process_pool._executors
+    assert get_process_pool(2).submit(pow, 2, 2).result() == 4
+    print("Discarded: next call starts a new pool")
+
+    process_pool.shutdown_process_pool()
+
+    print("Step-20 test completed.")
+
+
+if __name__ == "__main__":
+    test()
@@ -1,26 +1,84 @@
-import streamlit as st
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+# Streamlit is optional: CLI tools and workers log to a process-local list
+try:
+    import streamlit as st  # type: ignore
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    st = None
+    get_script_run_ctx = None
+
+
+_headless_logs = []
+
+# Per-thread capture buffers (see AppLogger.capture)
+_capture = threading.local()
+
+
+def _in_streamlit():
+    if st is None or get_script_run_ctx is None:
+        return False
+    return get_script_run_ctx() is not None
+
 
 class AppLogger:
     def __init__(self):
-        if "logs" not in st.session_state:
+        if _in_streamlit() and "logs" not in st.session_state:
             st.session_state["logs"] = []
 
-    def log(self, message):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted = f"[{timestamp}] {message}"
+    def _store(self):
+        buffer = getattr(_capture, "buffer", None)
+        if buffer is not None:
+            return buffer
+
+        if not _in_streamlit():
+            return _headless_logs
 
         # Ensure exists
         if "logs" not in st.session_state:
             st.session_state["logs"] = []
 
-        st.session_state["logs"].append(formatted)
+        return st.session_state["logs"]
+
+    def log(self, message):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        formatted = f"[{timestamp}] {message}"
+
+        self._store().append(formatted)
 
         print(formatted)
 
+    def extend(self, lines, prefix=""):
+        """
+        Append already formatted lines, e.g. logs collected in a worker.
+        They were printed when logged, so they are only stored here.
+        """
+        store = self._store()
+
+        for line in lines:
+            store.append(f"{prefix}{line}")
+
+    @contextmanager
+    def capture(self):
+        """
+        Collect this thread's log lines into a list instead of the session,
+        so worker threads can hand them back to be logged in order.
+        """
+        previous = getattr(_capture, "buffer", None)
+        lines = []
+        _capture.buffer = lines
+        try:
+            yield lines
+        finally:
+            _capture.buffer = previous
+
     def clear(self):
-        st.session_state["logs"] = []
+        if _in_streamlit():
+            st.session_state["logs"] = []
+        else:
+            _headless_logs.clear()
 
     def get_logs(self):
-        return st.session_state.get("logs", [])
+        return list(self._store())